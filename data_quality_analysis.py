@@ -1,63 +1,116 @@
 import pandas as pd
 import numpy as np
-import json
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import orjson
+import argparse
 from datetime import datetime
+from operator import itemgetter
 
-def load_and_clean_data():
+# Explicit column types so the CSV reader skips type inference and keeps
+# strings in Arrow memory instead of Python objects
+PROPERTIES_TYPES = {
+    'Property ID': pa.string(),
+    'Address': pa.string(),
+    'Property Type': pa.dictionary(pa.int32(), pa.string()),
+    'Sales': pa.string()
+}
+
+# Room counts and years are whole numbers, so they are read as integers (written as
+# '4', not '4.0') with Arrow nulls for the gaps
+DETAILS_TYPES = {
+    'ID': pa.string(),
+    'Living_Area_M2': pa.float32(),
+    'Num_Rooms': pa.int32(),
+    'Construction_Year': pa.int32()
+}
+
+def read_csv_arrow(filepath, column_types):
+    """Read a CSV from a memory map with pyarrow, keeping the columns Arrow-backed"""
+    # Empty cells count as missing, the same as pd.read_csv
+    convert_options = pa_csv.ConvertOptions(column_types=column_types, strings_can_be_null=True)
+    with pa.memory_map(filepath) as source:
+        table = pa_csv.read_csv(source, convert_options=convert_options)
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+CURRENT_YEAR = datetime.now().year
+
+# Create a clean dataset by removing rows with missing values
+# We'll keep rows where essential features are present. Sale_Prices is
+# never missing (an empty Sales cell parses to []), so only the scalar
+# columns are checked and Sales is parsed after filtering
+ESSENTIAL_COLUMNS = [
+    'Property ID', 'Address', 'Property Type', 'Living_Area_M2',
+    'Num_Rooms', 'Construction_Year'
+]
+
+SALES_COLUMNS = ['Sales', 'Sale_Dates', 'Sale_Prices']
+
+# C-level field getters used to pull the dates and prices out of each sales list
+get_sale_date = itemgetter('Sale Date')
+get_sale_price = itemgetter('Price')
+
+def parse_sales(sales_json):
+    """Parse a Sales JSON cell into the sales list, sale dates and sale prices"""
+    # Missing cells arrive as None or NaN (NaN != NaN), so no per-row pd.notna call is needed
+    sales = orjson.loads(sales_json) if sales_json == sales_json and sales_json else []
+    return sales, list(map(get_sale_date, sales)), list(map(get_sale_price, sales))
+
+def load_and_clean_data(verbose=False):
     # Load the main datasets
-    properties_df = pd.read_csv('data/scraped_properties.csv')
-    details_df = pd.read_csv('data/property_details.csv')
-    
-    # Merge the datasets on Property ID
-    merged_df = pd.merge(properties_df, details_df, 
-                        left_on='Property ID', 
-                        right_on='ID', 
-                        how='inner')
-    
-    # Convert Sales column from string to list of dictionaries
-    merged_df['Sales'] = merged_df['Sales'].apply(lambda x: json.loads(x) if pd.notna(x) else [])
-    
-    # Extract sale dates and prices
-    merged_df['Sale_Dates'] = merged_df['Sales'].apply(lambda x: [sale['Sale Date'] for sale in x])
-    merged_df['Sale_Prices'] = merged_df['Sales'].apply(lambda x: [sale['Price'] for sale in x])
-    
-    # Calculate data quality metrics
-    print("\n=== Data Quality Analysis ===")
-    print("\nMissing Values Analysis:")
-    print(merged_df.isnull().sum())
-    
-    print("\nData Types:")
-    print(merged_df.dtypes)
-    
-    print("\nBasic Statistics for Numerical Columns:")
-    print(merged_df.describe())
+    properties_df = read_csv_arrow('data/scraped_properties.csv', PROPERTIES_TYPES)
+    details_df = read_csv_arrow('data/property_details.csv', DETAILS_TYPES)
     
-    # Create a clean dataset by removing rows with missing values
-    # We'll keep rows where essential features are present
-    essential_columns = [
-        'Property ID', 'Address', 'Property Type', 'Living_Area_M2',
-        'Num_Rooms', 'Construction_Year', 'Sale_Prices'
-    ]
+    # Merge the datasets on Property ID, joining on the indexes so the
+    # redundant ID key column is not carried into the result. Other columns
+    # found in both files (e.g. Address, Link) get pd.merge's _x/_y suffixes
+    merged_df = properties_df.set_index('Property ID').join(
+        details_df.set_index('ID'), how='inner', lsuffix='_x', rsuffix='_y'
+    ).rename_axis('Property ID').reset_index()
     
-    clean_df = merged_df.dropna(subset=essential_columns)
+    merged_rows = len(merged_df)
     
-    # Additional cleaning steps
-    # Remove rows where living area is 0 or negative
-    clean_df = clean_df[clean_df['Living_Area_M2'] > 0]
+    # Calculate data quality metrics (each one scans the full merged dataset)
+    if verbose:
+        print("\n=== Data Quality Analysis ===")
+        print("\nMissing Values Analysis:")
+        print(merged_rows - merged_df.count())
+        
+        print("\nData Types:")
+        print(merged_df.dtypes)
+        
+        print("\nBasic Statistics for Numerical Columns:")
+        print(merged_df.select_dtypes('number').agg(['count', 'mean', 'std', 'min', 'max']))
     
-    # Remove rows where number of rooms is 0 or negative
-    clean_df = clean_df[clean_df['Num_Rooms'] > 0]
+    # Build a single mask so the filtered copy is only made once:
+    # essential features present, living area and number of rooms positive
+    # and construction year not in the future. The filters can't be pushed
+    # below the merge because the statistics above cover the full merged data
+    # Comparisons run on the raw numpy arrays to skip Series index alignment;
+    # missing Arrow values become NaN so they fail every comparison
+    living_area = merged_df['Living_Area_M2'].to_numpy(dtype=np.float32, na_value=np.nan)
+    num_rooms = merged_df['Num_Rooms'].to_numpy(dtype=np.float32, na_value=np.nan)
+    construction_year = merged_df['Construction_Year'].to_numpy(dtype=np.float32, na_value=np.nan)
+    mask = (
+        merged_df[ESSENTIAL_COLUMNS].notna().to_numpy().all(axis=1)
+        & (living_area > 0)
+        & (num_rooms > 0)
+        & (construction_year <= CURRENT_YEAR)
+    )
+    clean_df = merged_df.iloc[mask].copy()
     
-    # Remove rows where construction year is in the future
-    current_year = datetime.now().year
-    clean_df = clean_df[clean_df['Construction_Year'] <= current_year]
+    # Convert Sales column from string to list of dictionaries and extract
+    # sale dates and prices in a single pass, only for the rows that are kept
+    parsed_sales = list(map(parse_sales, clean_df['Sales'].to_numpy(dtype=object, na_value=None)))
+    clean_df[SALES_COLUMNS] = pd.DataFrame(parsed_sales, columns=SALES_COLUMNS, index=clean_df.index)
     
     # Save the clean dataset
     clean_df.to_csv('data/clean_property_data.csv', index=False)
     
-    print(f"\nOriginal dataset size: {len(merged_df)} rows")
-    print(f"Clean dataset size: {len(clean_df)} rows")
-    print(f"Removed {len(merged_df) - len(clean_df)} rows due to missing or invalid data")
+    clean_rows = len(clean_df)
+    print(f"\nOriginal dataset size: {merged_rows} rows")
+    print(f"Clean dataset size: {clean_rows} rows")
+    print(f"Removed {merged_rows - clean_rows} rows due to missing or invalid data")
     
     # Print some examples of cleaned data
     print("\nSample of cleaned data:")
@@ -65,4 +118,7 @@ def load_and_clean_data():
                    'Num_Rooms', 'Construction_Year']].head())
 
 if __name__ == "__main__":
-    load_and_clean_data() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Merge and clean the scraped property data')
+    parser.add_argument('--verbose', action='store_true', help='Print missing values, data types and statistics for the merged data')
+    args = parser.parse_args()
+    load_and_clean_data(verbose=args.verbose) 
\ No newline at end of file
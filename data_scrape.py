@@ -1,18 +1,24 @@
-import csv
-import uuid
-from playwright.sync_api import sync_playwright, TimeoutError
-from bs4 import BeautifulSoup
-import time
+import asyncio
+from playwright.async_api import async_playwright, TimeoutError
 import random
 import os
 import logging
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from datetime import datetime, timedelta
 import sys
 from tqdm import tqdm
 import urllib.parse
-import json
+from pathlib import Path
+import orjson
 import re
+import csv
+from collections import defaultdict
+from functools import lru_cache
+from operator import itemgetter
+from aiolimiter import AsyncLimiter
+import shelve
+import hashlib
+import argparse
 
 # Set up logging
 logging.basicConfig(
@@ -24,28 +30,123 @@ logging.basicConfig(
     ]
 )
 
+# Number of browser pages fetching listing pages at the same time
+MAX_CONCURRENT_PAGES = 4
+
+# Seconds between page loads on the same domain, shared by all workers
+DOMAIN_RATE_PERIOD = 2.0
+
+# One rate limiter per domain (netloc), created on first use
+DOMAIN_LIMITERS = defaultdict(lambda: AsyncLimiter(1, DOMAIN_RATE_PERIOD))
+
+# Raw containers of scraped listing pages are cached on disk, so a rerun skips pages
+# that already succeeded. Entries older than PAGE_CACHE_MAX_AGE are scraped again
+PAGE_CACHE_PATH = 'data/.scrape_cache'
+PAGE_CACHE_MAX_AGE = timedelta(days=1)
+
+# Screenshots, HTML dumps and API responses of listing pages are only written when SCRAPER_DEBUG=1
+SCRAPER_DEBUG = os.environ.get('SCRAPER_DEBUG') == '1'
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+# Requests that are not needed to read the listings: static assets by resource type
+# and third-party analytics/tracking hosts (matched on the end of the host name)
+BLOCKED_RESOURCE_TYPES = frozenset({'image', 'font', 'media', 'stylesheet'})
+BLOCKED_HOSTS = (
+    'google-analytics.com',
+    'googletagmanager.com',
+    'doubleclick.net',
+    'facebook.net',
+    'hotjar.com',
+)
+
+# Regexes used by format_price and format_date for every sale row
+PRICE_STRIP_RE = re.compile(r'[^\d,]')
+DATE_SEPARATED_RE = re.compile(r'(\d{2})[.-](\d{2})[.-](\d{4})')
+DATE_NUMERIC_RE = re.compile(r'(\d{1,2})(\d{2})(\d{4})')
+
+# Danish postal codes are 4 digits: a standalone number in the address text, or a
+# dash-separated part of the property slug (address-postalcode-city-id)
+ADDRESS_POSTAL_CODE_RE = re.compile(r'\b(\d{4})\b')
+SLUG_POSTAL_CODE_RE = re.compile(r'(?:^|-)(\d{4})(?=-|$)')
+
+# Map of known sale types, keyed by the lowercase text matched in the raw sale type
+SALE_TYPE_MAPPING = {
+    "fri handel": "Fri handel",
+    "tvangsauktion": "Tvangsauktion",
+    "familie handel": "Familie handel",
+    "andet": "Andet"
+}
+
+# Property container selector, shared by the Playwright wait and the HTML parsing.
+# Matching on the class set is cheaper than a substring match on the class attribute
+# and does not depend on the order the classes are listed in
+CONTAINER_CSS = 'div.shadow.overflow-hidden.mx-4'
+
+# CSS selectors used inside each property container, passed to EXTRACT_JS
+EXTRACT_SELECTORS = {
+    'container': CONTAINER_CSS,
+    'link': 'a[href*="/adresse/"]',
+    'property_type': 'div.text-gray-600.font-normal.text-sm',
+    'address': 'div.font-black.text-sm',
+    'table_type': 'thead th:first-child div',
+    'address_cell': 'td[rowspan] div',
+}
+
+# Runs in the page and returns the raw fields of every property container in one call,
+# so the rendered HTML never has to be transferred and re-parsed in Python.
+# Text fields are null when their element is missing; each sales table row is a list
+# of its cells' text and whether the cell has a rowspan (the address cell)
+EXTRACT_JS = """
+(selectors) => {
+    const textOf = (root, selector) => {
+        const node = root ? root.querySelector(selector) : null;
+        return node ? node.textContent.trim() : null;
+    };
+    return Array.from(document.querySelectorAll(selectors.container), (container) => {
+        const link = container.querySelector(selectors.link);
+        const table = container.querySelector('table');
+        const tbody = table ? table.querySelector('tbody') : null;
+        const rows = tbody ? Array.from(tbody.querySelectorAll('tr')) : [];
+        return {
+            link: link ? link.getAttribute('href') : null,
+            property_type: textOf(container, selectors.property_type),
+            address: textOf(container, selectors.address),
+            table_type: textOf(table, selectors.table_type),
+            address_cell: textOf(rows[0], selectors.address_cell),
+            rows: rows.map((row) => Array.from(row.querySelectorAll('td'), (cell) => ({
+                text: cell.textContent.trim(),
+                rowspan: cell.hasAttribute('rowspan'),
+            }))),
+        };
+    });
+}
+"""
+
 class ProgressTracker:
     def __init__(self, total_pages: int):
         self.start_time = datetime.now()
         self.total_pages = total_pages
         self.processed_pages = 0
         self.total_containers = 0
-        self.processed_containers = 0
-        self.container_times = []
-        self.page_times = []
+        # Running total, so the average doesn't re-sum every past page time
+        self.page_time_sum = 0.0
+        # Pages are fetched concurrently, so start times are tracked per page
+        self.page_start_times = {}
         
     def start_page(self, page_number: int):
-        self.page_start_time = datetime.now()
+        self.page_start_times[page_number] = datetime.now()
         logging.info(f"\n{'='*50}")
         logging.info(f"Starting page {page_number}/{self.total_pages}")
         
-    def end_page(self, containers_count: int):
-        page_time = (datetime.now() - self.page_start_time).total_seconds()
-        self.page_times.append(page_time)
+    def end_page(self, page_number: int, containers_count: int):
+        page_start_time = self.page_start_times.pop(page_number)
+        page_time = (datetime.now() - page_start_time).total_seconds()
+        self.page_time_sum += page_time
         self.processed_pages += 1
         self.total_containers += containers_count
         
-        avg_page_time = sum(self.page_times) / len(self.page_times)
+        avg_page_time = self.page_time_sum / self.processed_pages
         remaining_pages = self.total_pages - self.processed_pages
         estimated_remaining_time = avg_page_time * remaining_pages
         
@@ -55,40 +156,21 @@ class ProgressTracker:
         logging.info(f"Estimated remaining time: {timedelta(seconds=int(estimated_remaining_time))}")
         logging.info(f"Progress: {self.processed_pages}/{self.total_pages} pages ({self.processed_pages/self.total_pages*100:.1f}%)")
         
-    def start_container(self):
-        self.container_start_time = datetime.now()
-        
-    def end_container(self):
-        container_time = (datetime.now() - self.container_start_time).total_seconds()
-        self.container_times.append(container_time)
-        self.processed_containers += 1
-        
-        if self.processed_containers % 10 == 0:  # Update progress every 10 containers
-            avg_container_time = sum(self.container_times) / len(self.container_times)
-            remaining_containers = self.total_containers - self.processed_containers
-            estimated_remaining_time = avg_container_time * remaining_containers
-            
-            logging.info(f"Processed {self.processed_containers}/{self.total_containers} containers")
-            logging.info(f"Average container time: {avg_container_time:.2f}s")
-            logging.info(f"Estimated remaining time: {timedelta(seconds=int(estimated_remaining_time))}")
-            
     def get_summary(self):
         total_time = (datetime.now() - self.start_time).total_seconds()
-        avg_page_time = sum(self.page_times) / len(self.page_times) if self.page_times else 0
-        avg_container_time = sum(self.container_times) / len(self.container_times) if self.container_times else 0
+        avg_page_time = self.page_time_sum / self.processed_pages if self.processed_pages else 0
         
         logging.info("\n" + "="*50)
         logging.info("Scraping Summary:")
         logging.info(f"Total time: {timedelta(seconds=int(total_time))}")
         logging.info(f"Total pages processed: {self.processed_pages}")
-        logging.info(f"Total containers processed: {self.processed_containers}")
+        logging.info(f"Total containers processed: {self.total_containers}")
         logging.info(f"Average page time: {avg_page_time:.2f}s")
-        logging.info(f"Average container time: {avg_container_time:.2f}s")
         logging.info("="*50)
 
-def setup_browser():
-    playwright = sync_playwright().start()
-    browser = playwright.chromium.launch(
+async def setup_browser():
+    playwright = await async_playwright().start()
+    browser = await playwright.chromium.launch(
         headless=True,
         args=[
             '--disable-blink-features=AutomationControlled',
@@ -100,10 +182,111 @@ def setup_browser():
     )
     return browser, playwright
 
-def wait_for_network_idle(page, timeout=30000):
+async def block_route(route):
+    request = route.request
+    if request.resource_type in BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+        return
+    host = urllib.parse.urlsplit(request.url).hostname or ''
+    if host.endswith(BLOCKED_HOSTS):
+        await route.abort()
+    else:
+        await route.continue_()
+
+async def new_page(browser, storage_state: Optional[Dict] = None):
+    """Open a page in a fresh browser context, optionally starting from a warmed session"""
+    context = await browser.new_context(user_agent=USER_AGENT, storage_state=storage_state)
+    await context.route('**/*', block_route)
+    return await context.new_page()
+
+class PagePool:
+    """
+    A warm pool of MAX_CONCURRENT_PAGES pages for one base URL, each in its own browser
+    context. Pages are borrowed with get_page() and handed back with recycle(), which
+    replaces a page that crashed instead of relaunching the whole browser.
+    """
+    def __init__(self, browser, pool_size: int = MAX_CONCURRENT_PAGES):
+        self.browser = browser
+        self.pool_size = pool_size
+        self.storage_state = None
+        self.pages = asyncio.Queue()
+    
+    async def fill(self, warmup_url: str):
+        """
+        The first page loads warmup_url and the other contexts start from its storage
+        state, so they reuse its cookies instead of each warming up a session.
+        """
+        first_page = await new_page(self.browser)
+        await rate_limited_goto(first_page, warmup_url, wait_until='domcontentloaded', timeout=60000)
+        self.storage_state = await first_page.context.storage_state()
+        
+        self.pages.put_nowait(first_page)
+        for _ in range(self.pool_size - 1):
+            self.pages.put_nowait(await new_page(self.browser, self.storage_state))
+    
+    async def get_page(self):
+        return await self.pages.get()
+    
+    async def recycle(self, page, check_alive: bool = False):
+        """
+        Return a page to the pool. A closed page, or one that fails a simple evaluate
+        when check_alive is set (e.g. after an error), is replaced by a fresh page.
+        """
+        if page.is_closed() or (check_alive and not await self._is_alive(page)):
+            logging.error("Browser page appears to have crashed, replacing it...")
+            try:
+                await page.context.close()
+            except Exception as close_error:
+                logging.error(f"Error closing browser context: {close_error}")
+            page = await new_page(self.browser, self.storage_state)
+            logging.info("Browser page replaced successfully")
+        self.pages.put_nowait(page)
+    
+    @staticmethod
+    async def _is_alive(page) -> bool:
+        try:
+            await page.evaluate("1 + 1")
+            return True
+        except Exception:
+            return False
+
+class BrowserManager:
+    """
+    Owns the browser, which is shared by one PagePool per base URL so URLs don't share
+    cookies or pages.
+    """
+    def __init__(self):
+        self.browser = None
+        self.playwright = None
+    
+    async def start(self):
+        self.browser, self.playwright = await setup_browser()
+    
+    async def create_pool(self, warmup_url: str) -> PagePool:
+        page_pool = PagePool(self.browser)
+        await page_pool.fill(warmup_url)
+        return page_pool
+    
+    async def close(self):
+        # Closing the browser also closes its contexts
+        if self.browser:
+            await self.browser.close()
+        if self.playwright:
+            await self.playwright.stop()
+
+async def rate_limited_goto(page, url: str, **kwargs):
+    """
+    Navigate to url once its domain's rate limiter allows it. This keeps the load on
+    each site polite without sleeping between pages, and workers on different
+    domains don't hold each other up.
+    """
+    async with DOMAIN_LIMITERS[urllib.parse.urlsplit(url).netloc]:
+        return await page.goto(url, **kwargs)
+
+async def wait_for_network_idle(page, timeout=30000):
     """Wait for network activity to settle down"""
     try:
-        page.wait_for_load_state('networkidle', timeout=timeout)
+        await page.wait_for_load_state('networkidle', timeout=timeout)
     except TimeoutError:
         logging.warning("Network idle timeout, continuing anyway")
 
@@ -138,29 +321,31 @@ def format_price(price_text: str) -> float:
     # Remove any non-numeric characters except for decimal points
     price_text = price_text.replace("kr.", "").replace(".", "").strip()
     # Keep only digits and decimal points
-    price_text = re.sub(r'[^\d,]', '', price_text)
+    price_text = PRICE_STRIP_RE.sub('', price_text)
     # Replace comma with dot for decimal
     price_text = price_text.replace(",", ".")
     
     try:
         return float(price_text)
     except ValueError:
-        logging.warning(f"Could not convert price: {price_text}")
+        logging.warning("Could not convert price: %s", price_text)
         return None
 
+# Sale dates repeat a lot across properties, so cleaned dates are cached
+@lru_cache(maxsize=4096)
 def format_date(date_text: str) -> str:
     """Format and validate date string"""
     if not date_text or date_text == "N/A":
         return None
     
     # Check if it contains a date pattern DD-MM-YYYY
-    date_match = re.search(r'(\d{2})[.-](\d{2})[.-](\d{4})', date_text)
+    date_match = DATE_SEPARATED_RE.search(date_text)
     if date_match:
         day, month, year = date_match.groups()
         return f"{day}-{month}-{year}"
     
     # Check for numeric date format like DDMMYYYY
-    num_match = re.search(r'(\d{1,2})(\d{2})(\d{4})', date_text)
+    num_match = DATE_NUMERIC_RE.search(date_text)
     if num_match:
         day, month, year = num_match.groups()
         # Pad day with leading zero if needed
@@ -172,6 +357,8 @@ def format_date(date_text: str) -> str:
     
     return date_text
 
+# There are only a handful of distinct raw sale types
+@lru_cache(maxsize=None)
 def determine_sale_type(sale_type_text: str) -> str:
     """Clean and standardize the sale type"""
     if not sale_type_text or sale_type_text == "N/A":
@@ -180,233 +367,426 @@ def determine_sale_type(sale_type_text: str) -> str:
     # Lowercase for comparison
     sale_type_lower = sale_type_text.lower()
     
-    # Map of known sale types
-    sale_type_mapping = {
-        "fri handel": "Fri handel",
-        "tvangsauktion": "Tvangsauktion",
-        "familie handel": "Familie handel",
-        "andet": "Andet"
-    }
-    
     # Check each known sale type
-    for key, value in sale_type_mapping.items():
+    for key, value in SALE_TYPE_MAPPING.items():
         if key in sale_type_lower:
             return value
     
     return sale_type_text
 
-def fetch_page_data(page, page_number: int, base_url: str, max_retries: int = 3) -> List[Dict]:
+class PageCache:
+    """
+    Shelve-backed cache of the raw containers scraped from each listing page URL,
+    keyed by the SHA-256 of the URL and stored with the time they were scraped.
+    """
+    def __init__(self, filepath: str, max_age: timedelta = PAGE_CACHE_MAX_AGE):
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        self.shelf = shelve.open(filepath)
+        self.max_age = max_age
+        
+    @staticmethod
+    def key(url: str) -> str:
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+        
+    def get(self, url: str) -> Optional[List[Dict]]:
+        """Return the cached containers for url, or None if missing or expired"""
+        entry = self.shelf.get(self.key(url))
+        if entry is None:
+            return None
+        scraped_at, containers = entry
+        if datetime.now() - scraped_at > self.max_age:
+            return None
+        return containers
+        
+    def put(self, url: str, containers: List[Dict]):
+        self.shelf[self.key(url)] = (datetime.now(), containers)
+        
+    def close(self):
+        self.shelf.close()
+
+def parse_containers(containers: List[Dict], page_number: int, seen: Dict[str, int]) -> List[Dict]:
+    """
+    Build property records from the raw containers returned by EXTRACT_JS. seen maps every
+    property ID scraped so far to the page it was first found on; properties already in it
+    are skipped and new ones are added.
+    """
     page_data_list = []
-    processed_property_ids = set()  # Track processed property IDs
+    
+    # Extract information from each container
+    for container in containers:
+        try:
+            link = container['link']
+            if not link:
+                continue
+                
+            # Use the link as the unique identifier for the property
+            property_id = link.split('/')[-1]
+            
+            # Skip if we've already processed this property, here or on another page.
+            # setdefault records it with a single lookup; the size tells if it was new
+            seen_count = len(seen)
+            seen.setdefault(property_id, page_number)
+            if len(seen) == seen_count:
+                continue
+            
+            # Default values
+            property_type = "N/A"
+            address = "N/A"
+            postal_code = "N/A"
+            
+            # Fields are None when their element was not found
+            if container['property_type'] is not None:
+                property_type = container['property_type']
+            
+            if container['address'] is not None:
+                address = container['address']
+            
+            # Look in the desktop view table as backup
+            if container['table_type'] is not None and (property_type == "N/A" or not property_type):
+                property_type = container['table_type']
+            
+            if address == "N/A" and container['address_cell'] is not None:
+                address = container['address_cell']
+            
+            # Take the postal code from the address, falling back to the property_id slug
+            postal_match = ADDRESS_POSTAL_CODE_RE.search(address) or SLUG_POSTAL_CODE_RE.search(property_id)
+            if postal_match:
+                postal_code = postal_match.group(1)
+    
+            # Process sale records within the container
+            sales = []
+            
+            for cells in container['rows']:
+                # Each row should have at least 3 cells (sale type, date, price)
+                if len(cells) < 3:
+                    continue
+                    
+                # If the first cell has rowspan, it's the address cell (skip it)
+                # The sale data starts from index 0 or 1 depending on the row
+                start_idx = 0
+                
+                # Check if the first cell has address info (has rowspan)
+                first_cell = cells[0]
+                if first_cell['rowspan']:
+                    # This is the address cell, sale data starts at index 1
+                    start_idx = 1
+                    
+                # Extract the sale data from the correct indices
+                if start_idx + 2 < len(cells):  # Make sure we have enough cells
+                    sale_type = cells[start_idx]['text']
+                    sale_date = cells[start_idx + 1]['text']
+                    price_text = cells[start_idx + 2]['text']
+                    
+                    # Format and clean the data
+                    sale_type_clean = determine_sale_type(sale_type)
+                    sale_date_clean = format_date(sale_date)
+                    price_clean = format_price(price_text)
+                    
+                    sales.append({
+                        'Sale Type': sale_type_clean,
+                        'Raw Sale Type': sale_type,
+                        'Sale Date': sale_date_clean,
+                        'Raw Sale Date': sale_date,
+                        'Price': price_clean,
+                        'Raw Price': price_text
+                    })
+
+            # If no sales records were found, add a record with N/A values
+            if not sales:
+                sales.append({
+                    'Sale Type': 'N/A',
+                    'Raw Sale Type': 'N/A',
+                    'Sale Date': None,
+                    'Raw Sale Date': 'N/A',
+                    'Price': None,
+                    'Raw Price': 'N/A'
+                })
+            
+            # Create a single entry for this property with all sales data
+            property_data = {
+                'Property ID': property_id,
+                'Link': link,
+                'Address': address,
+                'Postal_Code': postal_code,
+                'Property_Type': property_type,
+                'Sales': sales,  # Serialized to JSON when written to the CSV
+                'First Sale Type': sales[0]['Sale Type'] if sales else 'N/A',
+                'First Sale Date': sales[0]['Sale Date'] if sales else 'N/A',
+                'First Sale Price': sales[0]['Price'] if sales else 'N/A',
+                'Sales Count': len(sales),
+                'Page Number': page_number
+            }
+            
+            page_data_list.append(property_data)
+                
+        except Exception as e:
+            logging.error("Error processing container: %s", e)
+            continue
+    
+    # Log the actual number of unique properties processed
+    logging.info(f"Processed {len(page_data_list)} unique properties on page {page_number}")
+    
+    return page_data_list
+
+async def fetch_page_data(page, page_number: int, base_url: str, seen: Dict[str, int],
+                          page_cache: Optional[PageCache] = None, max_retries: int = 3) -> Tuple[List[Dict], int]:
+    """
+    Scrape one listing page, or rebuild it from page_cache when an earlier run already
+    scraped it. See parse_containers for how seen is used. Returns the new property
+    records together with the number of containers found on the page, so a page of
+    already seen properties can be told apart from an empty or failed one (0 containers).
+    """
+    # Construct URL with page number
+    url = construct_page_url(base_url, page_number)
+    
+    containers = page_cache.get(url) if page_cache is not None else None
+    if containers is not None:
+        logging.info(f"Page {page_number}: Using {len(containers)} cached property containers.")
+        return parse_containers(containers, page_number, seen), len(containers)
     
     for attempt in range(max_retries):
         try:
-            # Construct URL with page number
-            url = construct_page_url(base_url, page_number)
             logging.info(f"Loading page {page_number} (attempt {attempt + 1}/{max_retries}): {url}")
             
-            # Navigate to the page and wait for network idle
-            page.goto(url, wait_until='domcontentloaded', timeout=60000)
-            wait_for_network_idle(page)
+            # Navigate to the page. The container selector wait below is the real signal
+            # that the listings are in the DOM, so navigation only needs to be committed
+            # and there is no wait for network idle (analytics beacons keep it busy)
+            await rate_limited_goto(page, url, wait_until='commit', timeout=20000)
             
             # Wait for the main content to load with specific selector
-            page.wait_for_selector('div[class*="shadow overflow-hidden mx-4"]', timeout=30000)
-            
-            # Add a random delay to help with server load
-            time.sleep(random.uniform(3, 6))
+            await page.wait_for_selector(CONTAINER_CSS, timeout=30000)
             
             # Save screenshot and HTML for debugging (only for first and failed pages)
-            if page_number == 1 or attempt > 0:
+            if SCRAPER_DEBUG and (page_number == 1 or attempt > 0):
+                # JPEG encodes much faster than PNG and is good enough for debugging
                 os.makedirs('debug/screenshots', exist_ok=True)
-                page.screenshot(path=f'debug/screenshots/page_{page_number}_attempt_{attempt+1}.png')
+                await page.screenshot(path=f'debug/screenshots/page_{page_number}_attempt_{attempt+1}.jpg',
+                                      full_page=False, type='jpeg', quality=40)
                 
                 os.makedirs('debug/html', exist_ok=True)
-                with open(f'debug/html/page_{page_number}_attempt_{attempt+1}.html', 'w', encoding='utf-8') as f:
-                    f.write(page.content())
-            
-            # Get the HTML content after JavaScript has been executed
-            html = page.content()
-            
-            # Use BeautifulSoup to parse the HTML content
-            soup = BeautifulSoup(html, 'html.parser')
+                html = await page.content()
+                Path(f'debug/html/page_{page_number}_attempt_{attempt+1}.html').write_bytes(html.encode('utf-8'))
             
-            # Find property containers with specific selector
-            containers = soup.select('div[class*="shadow overflow-hidden mx-4"]')
+            # Pull the raw fields of every property container out of the DOM in one call
+            containers = await page.evaluate(EXTRACT_JS, EXTRACT_SELECTORS)
             
             logging.info(f"Page {page_number}: Found {len(containers)} property containers.")
             
             if not containers:
                 logging.warning(f"No containers found on page {page_number}, retrying...")
-                time.sleep(random.uniform(5, 10))
+                await asyncio.sleep(random.uniform(5, 10))
                 continue
             
-            # Extract information from each container with progress tracking
-            for container in tqdm(containers, desc="Containers", position=1, leave=False):
-                try:
-                    # Find link with specific selector
-                    link_tag = container.select_one('a[href*="/adresse/"]')
-                    if not link_tag:
-                        continue
-                        
-                    link = link_tag['href']
-                    # Use the link as the unique identifier for the property
-                    property_id = link.split('/')[-1]
-                    
-                    # Skip if we've already processed this property
-                    if property_id in processed_property_ids:
-                        continue
-                        
-                    processed_property_ids.add(property_id)
-                    
-                    # Default values
-                    property_type = "N/A"
-                    address = "N/A"
-                    postal_code = "N/A"
-                    
-                    # Extract postal code from property_id
-                    # Format is typically: address-postalcode-city-id
-                    if '-' in property_id:
-                        parts = property_id.split('-')
-                        for i, part in enumerate(parts):
-                            # Postal code is typically a 4-digit number
-                            if part.isdigit() and len(part) == 4:
-                                postal_code = part
-                                break
-                    
-                    # Find the property type - using the parent div of the property type content
-                    type_container = container.select_one('div.text-gray-600.font-normal.text-sm')
-                    if type_container:
-                        property_type = type_container.text.strip()
-                    
-                    # Find the address
-                    address_div = container.select_one('div.font-black.text-sm')
-                    if address_div:
-                        address = address_div.text.strip()
-                    
-                    # Look in the desktop view table as backup
-                    table = container.find('table')
-                    if table:
-                        # Try to find property type from table header
-                        thead_type = table.select_one('thead th:first-child div')
-                        if thead_type and (property_type == "N/A" or not property_type):
-                            property_type = thead_type.text.strip()
-                        
-                        # Find address from tbody if not already found
-                        if address == "N/A":
-                            tbody = table.find('tbody')
-                            if tbody:
-                                first_row = tbody.find('tr')
-                                if first_row:
-                                    address_cell = first_row.select_one('td[rowspan]')
-                                    if address_cell:
-                                        address_divs = address_cell.find_all('div')
-                                        if len(address_divs) >= 1:
-                                            address = address_divs[0].text.strip()
-            
-                    # Process sale records within the container
-                    sales = []
-                    
-                    if table:
-                        # Get only the tbody rows (skip thead)
-                        tbody = table.find('tbody')
-                        if tbody:
-                            table_rows = tbody.find_all('tr')
-                            
-                            for row in table_rows:
-                                cells = row.find_all('td')
-                                
-                                # Each row should have at least 3 cells (sale type, date, price)
-                                if len(cells) < 3:
-                                    continue
-                                    
-                                # If the first cell has rowspan, it's the address cell (skip it)
-                                # The sale data starts from index 0 or 1 depending on the row
-                                start_idx = 0
-                                
-                                # Check if the first cell has address info (has rowspan)
-                                first_cell = cells[0]
-                                if 'rowspan' in first_cell.attrs:
-                                    # This is the address cell, sale data starts at index 1
-                                    start_idx = 1
-                                    
-                                # Extract the sale data from the correct indices
-                                if start_idx + 2 < len(cells):  # Make sure we have enough cells
-                                    sale_type = cells[start_idx].text.strip()
-                                    sale_date = cells[start_idx + 1].text.strip()
-                                    price_text = cells[start_idx + 2].text.strip()
-                                    
-                                    # Format and clean the data
-                                    sale_type_clean = determine_sale_type(sale_type)
-                                    sale_date_clean = format_date(sale_date)
-                                    price_clean = format_price(price_text)
-                                    
-                                    sales.append({
-                                        'Sale Type': sale_type_clean,
-                                        'Raw Sale Type': sale_type,
-                                        'Sale Date': sale_date_clean,
-                                        'Raw Sale Date': sale_date,
-                                        'Price': price_clean,
-                                        'Raw Price': price_text
-                                    })
-            
-                    # If no sales records were found, add a record with N/A values
-                    if not sales:
-                        sales.append({
-                            'Sale Type': 'N/A',
-                            'Raw Sale Type': 'N/A',
-                            'Sale Date': None,
-                            'Raw Sale Date': 'N/A',
-                            'Price': None,
-                            'Raw Price': 'N/A'
-                        })
-                    
-                    # Create a single entry for this property with all sales data
-                    property_data = {
-                        'Property ID': property_id,
-                        'Link': link,
-                        'Address': address,
-                        'Postal_Code': postal_code,
-                        'Property_Type': property_type,
-                        'Sales': json.dumps(sales),  # Store all sales as JSON
-                        'First Sale Type': sales[0]['Sale Type'] if sales else 'N/A',
-                        'First Sale Date': sales[0]['Sale Date'] if sales else 'N/A',
-                        'First Sale Price': sales[0]['Price'] if sales else 'N/A',
-                        'Sales Count': len(sales),
-                        'Page Number': page_number
-                    }
-                    
-                    page_data_list.append(property_data)
-                        
-                except Exception as e:
-                    logging.error(f"Error processing container: {str(e)}")
-                    continue
+            if page_cache is not None:
+                page_cache.put(url, containers)
             
-            # Log the actual number of unique properties processed
-            logging.info(f"Processed {len(processed_property_ids)} unique properties on page {page_number}")
-            
-            return page_data_list
+            return parse_containers(containers, page_number, seen), len(containers)
             
         except TimeoutError:
             logging.warning(f"Timeout on page {page_number}, attempt {attempt + 1}/{max_retries}")
             if attempt < max_retries - 1:
-                time.sleep(random.uniform(10, 15))
+                await asyncio.sleep(random.uniform(10, 15))
                 continue
             else:
                 logging.error(f"All retries failed for page {page_number}")
-                return []
+                return [], 0
         except Exception as e:
             logging.error(f"Error processing page {page_number}: {e}")
             if attempt < max_retries - 1:
-                time.sleep(random.uniform(5, 10))
+                await asyncio.sleep(random.uniform(5, 10))
                 continue
             else:
-                return []
+                return [], 0
     
-    return page_data_list
+    return [], 0
+
+def find_total_pages(data) -> Optional[int]:
+    """Search a JSON payload from the site's API for its totalPages field"""
+    if isinstance(data, dict):
+        total_pages = data.get('totalPages')
+        if isinstance(total_pages, int) and total_pages > 0:
+            return total_pages
+        children = data.values()
+    elif isinstance(data, list):
+        children = data
+    else:
+        return None
+    
+    for child in children:
+        total_pages = find_total_pages(child)
+        if total_pages:
+            return total_pages
+    return None
+
+async def dump_api_responses(responses: List):
+    """Save the JSON API responses seen while loading a listing page, for debugging"""
+    os.makedirs('debug/api', exist_ok=True)
+    for index, response in enumerate(responses):
+        try:
+            body = await response.json()
+        except Exception:
+            # Not a JSON response
+            continue
+        Path(f'debug/api/response_{index}.json').write_bytes(
+            orjson.dumps({'url': response.url, 'status': response.status, 'body': body}, option=orjson.OPT_INDENT_2))
+
+async def get_total_pages(page, base_url: str) -> Optional[int]:
+    """Determine the number of result pages for a base URL, or None if it has no results"""
+    # The listing is rendered from XHR/fetch calls to the site's API, whose responses
+    # carry the exact page count
+    api_responses = []
+    def collect_api_response(response):
+        if response.request.resource_type in ('xhr', 'fetch'):
+            api_responses.append(response)
+    
+    page.on('response', collect_api_response)
+    try:
+        await rate_limited_goto(page, base_url, wait_until='domcontentloaded', timeout=60000)
+        await wait_for_network_idle(page)
+    finally:
+        page.remove_listener('response', collect_api_response)
+    
+    if SCRAPER_DEBUG:
+        await dump_api_responses(api_responses)
+    
+    for response in api_responses:
+        try:
+            total_pages = find_total_pages(await response.json())
+        except Exception:
+            # Not a JSON response
+            continue
+        if total_pages:
+            logging.info(f"Found {total_pages} total pages in API response")
+            return total_pages
+    
+    logging.warning("No page count in the API responses, falling back to the pagination links")
+    
+    # Try to find the total number of pages
+    try:
+        # Look for pagination elements
+        pagination = await page.query_selector('div[class*="pagination"]')
+        if pagination:
+            # Try to find the last page number
+            page_links = await pagination.query_selector_all('a')
+            if page_links:
+                last_page = await page_links[-2].text_content()
+                total_pages = int(last_page)
+                logging.info(f"Found {total_pages} total pages in pagination")
+            else:
+                # If no page links found, check if there's a "next" button
+                next_button = await pagination.query_selector('a[class*="next"]')
+                if next_button:
+                    # If there's a next button, we'll need to determine pages dynamically
+                    total_pages = 29  # Default to known value
+                    logging.info("Found pagination with next button, using default of 29 pages")
+                else:
+                    total_pages = 29
+                    logging.info("No pagination links found, assuming single page")
+        else:
+            # Check if there are any results at all
+            no_results = await page.query_selector('div[class*="no-results"]')
+            if no_results:
+                logging.warning("No results found for this URL")
+                return None
+            else:
+                total_pages = 29  # Default to known value
+                logging.info("No pagination found, using default of 29 pages")
+    except Exception as e:
+        logging.warning(f"Could not determine total pages: {e}")
+        total_pages = 29 # Default to known value
+        logging.info("Using default of 29 pages")
+    
+    return total_pages
 
-def main():
-    all_data_list = []
-    all_property_ids = set()  # Track all unique property IDs
+async def scrape_base_url(page_pool: PagePool, base_url: str, seen: Dict[str, int], data_writer,
+                          page_cache: Optional[PageCache] = None, bar_position: int = 0) -> bool:
+    """
+    Scrape all result pages of a base URL with MAX_CONCURRENT_PAGES workers pulling
+    page numbers off a queue, each borrowing a page from page_pool per page number.
+    Each page's properties are handed to data_writer as soon as the page is done.
+    bar_position keeps the progress bars of base URLs scraped at the same time apart.
+    Returns False if the base URL had no result pages to scrape.
+    """
+    page = await page_pool.get_page()
+    try:
+        total_pages = await get_total_pages(page, base_url)
+    finally:
+        await page_pool.recycle(page)
+    
+    if total_pages is None:
+        logging.error(f"Found no result pages for URL: {base_url}")
+        return False
+    
+    progress_tracker = ProgressTracker(total_pages)
+    consecutive_empty_pages = 0
+    # Set once 3 pages in a row came back empty, so the workers stop taking pages
+    stop_event = asyncio.Event()
+    
+    # Page numbers waiting to be scraped, shared by the workers
+    page_numbers = asyncio.Queue()
+    for page_number in range(1, total_pages + 1):
+        page_numbers.put_nowait(page_number)
+    
+    async def scrape_page(page_number: int, pbar):
+        """Scrape one page number with a page borrowed from the pool"""
+        nonlocal consecutive_empty_pages
+        page = await page_pool.get_page()
+        page_failed = False
+        try:
+            progress_tracker.start_page(page_number)
+            page_data, container_count = await fetch_page_data(page, page_number, base_url, seen, page_cache)
+            
+            if not container_count:
+                consecutive_empty_pages += 1
+                logging.warning(f"Empty page {page_number}, consecutive empty pages: {consecutive_empty_pages}")
+                # Call end_page with 0 containers if no data
+                progress_tracker.end_page(page_number, 0)
+            else:
+                # A page whose properties were all scraped already (listings shifting between
+                # pages, or base URLs overlapping) still loaded, so it isn't an empty page
+                consecutive_empty_pages = 0
+                if page_data:
+                    data_writer.write_page(page_data)
+                    logging.info(f"Successfully processed page {page_number}, total unique properties: {len(seen)}")
+                else:
+                    logging.info(f"All {container_count} properties on page {page_number} were already scraped")
+                
+                # Update progress tracker with the count of new unique properties on this page
+                progress_tracker.end_page(page_number, len(page_data))
+            
+        except Exception as e:
+            logging.error(f"Error processing page {page_number} for URL {base_url}: {e}")
+            consecutive_empty_pages += 1
+            # Call end_page with 0 containers on error
+            progress_tracker.end_page(page_number, 0)
+            page_failed = True
+        finally:
+            # Hand the page back first, replacing it if it crashed
+            await page_pool.recycle(page, check_alive=page_failed)
+            if consecutive_empty_pages >= 3:
+                stop_event.set()
+            pbar.update(1)
+        
+        if page_failed:
+            await asyncio.sleep(random.uniform(10, 15))
+    
+    async def worker(pbar):
+        """Take page numbers off the queue until none are left"""
+        while not stop_event.is_set():
+            try:
+                page_number = page_numbers.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            await scrape_page(page_number, pbar)
+    
+    with tqdm(total=total_pages, desc="Pages", position=bar_position) as pbar:
+        await asyncio.gather(*(worker(pbar) for _ in range(MAX_CONCURRENT_PAGES)))
+    
+    progress_tracker.get_summary()
+    return True
+
+async def main(use_cache: bool = True):
+    seen = {}  # Property ID -> page number it was first scraped from
     
     # Define the base URLs to scrape
     base_urls = [
@@ -415,250 +795,173 @@ def main():
         #'https://www.boligsiden.dk/landsdel/fyn/solgte?sortAscending=false&registrationTypes=auction&latestRegistrationType=auction'
     ]
     
-    # Set up browser outside the try block so we can refer to it in the finally block
-    browser = None
-    playwright = None
+    # Set up browser and writer outside the try block so we can refer to them in the finally block
+    browser_manager = BrowserManager()
+    data_writer = None
+    completed = False
+    page_cache = PageCache(PAGE_CACHE_PATH) if use_cache else None
     
     try:
-        browser, playwright = setup_browser()
-        context = browser.new_context(
-            user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        )
-        page = context.new_page()
+        await browser_manager.start()
         
-        # Process each base URL
-        for base_url in base_urls:
+        # Rows are written as each page is scraped, so partial results survive a crash. The
+        # writer is only created once the browser is up, so a failed start leaves the
+        # previous output alone
+        data_writer = ScrapedDataWriter("data/scraped_properties.csv", "data/scraped_properties_expanded.csv")
+        
+        async def process_url(index: int, base_url: str) -> bool:
+            """Scrape one base URL, returning whether it was scraped without failing"""
             logging.info(f"\n{'='*50}")
             logging.info(f"Starting to process URL: {base_url}")
             
             try:
-                # First, determine the total number of pages
-                page.goto(base_url, wait_until='domcontentloaded', timeout=60000)
-                wait_for_network_idle(page)
-                
-                # Try to find the total number of pages
-                try:
-                    # Look for pagination elements
-                    pagination = page.query_selector('div[class*="pagination"]')
-                    if pagination:
-                        # Try to find the last page number
-                        page_links = pagination.query_selector_all('a')
-                        if page_links:
-                            last_page = page_links[-2].text_content()
-                            total_pages = int(last_page)
-                            logging.info(f"Found {total_pages} total pages in pagination")
-                        else:
-                            # If no page links found, check if there's a "next" button
-                            next_button = pagination.query_selector('a[class*="next"]')
-                            if next_button:
-                                # If there's a next button, we'll need to determine pages dynamically
-                                total_pages = 29  # Default to known value
-                                logging.info("Found pagination with next button, using default of 29 pages")
-                            else:
-                                total_pages = 29
-                                logging.info("No pagination links found, assuming single page")
-                    else:
-                        # Check if there are any results at all
-                        no_results = page.query_selector('div[class*="no-results"]')
-                        if no_results:
-                            logging.warning("No results found for this URL")
-                            continue
-                        else:
-                            total_pages = 29  # Default to known value
-                            logging.info("No pagination found, using default of 29 pages")
-                except Exception as e:
-                    logging.warning(f"Could not determine total pages: {e}")
-                    total_pages = 29 # Default to known value
-                    logging.info("Using default of 29 pages")
-                
-                progress_tracker = ProgressTracker(total_pages)
-                page_number = 1
-                consecutive_empty_pages = 0
-                has_next_page = True
-                
-                with tqdm(total=total_pages, desc="Pages", position=0) as pbar:
-                    while has_next_page and consecutive_empty_pages < 3:
-                        try:
-                            progress_tracker.start_page(page_number)
-                            page_data = fetch_page_data(page, page_number, base_url)
-                            
-                            if not page_data:
-                                consecutive_empty_pages += 1
-                                logging.warning(f"Empty page {page_number}, consecutive empty pages: {consecutive_empty_pages}")
-                                # Call end_page with 0 containers if no data
-                                progress_tracker.end_page(0)
-                            else:
-                                consecutive_empty_pages = 0
-                                # Count unique properties for this page
-                                page_property_ids = set()
-                                for data in page_data:
-                                    page_property_ids.add(data['Property ID'])
-                                    all_property_ids.add(data['Property ID'])
-                                
-                                all_data_list.extend(page_data)
-                                logging.info(f"Successfully processed page {page_number}, total unique properties: {len(all_property_ids)}")
-                                
-                                # Update progress tracker with actual count of unique properties on this page
-                                progress_tracker.end_page(len(page_property_ids))
-                            
-                            pbar.update(1)
-                            
-                            # Check if there's a next page
-                            if page_number < total_pages:
-                                # Add a small delay between pages
-                                time.sleep(random.uniform(3, 6))
-                                page_number += 1
-                            else:
-                                has_next_page = False
-                            
-                        except Exception as e:
-                            logging.error(f"Error processing page {page_number} for URL {base_url}: {e}")
-                            consecutive_empty_pages += 1
-                            # Call end_page with 0 containers on error
-                            progress_tracker.end_page(0)
-                            
-                            # Check if we need to restart the browser due to a crash
-                            try:
-                                # Try a simple operation to check if browser is still usable
-                                page.evaluate("1 + 1")
-                            except Exception:
-                                logging.error("Browser appears to have crashed, restarting...")
-                                # Close and restart browser
-                                try:
-                                    if context:
-                                        context.close()
-                                    if browser:
-                                        browser.close()
-                                    if playwright:
-                                        playwright.stop()
-                                except Exception as close_error:
-                                    logging.error(f"Error closing browser: {close_error}")
-                                
-                                # Restart browser
-                                browser, playwright = setup_browser()
-                                context = browser.new_context(
-                                    user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-                                )
-                                page = context.new_page()
-                                logging.info("Browser restarted successfully")
-                            
-                            time.sleep(random.uniform(10, 15))
-                            continue
-                
-                progress_tracker.get_summary()
+                # Each base URL gets its own pool of pages and contexts in the shared browser
+                page_pool = await browser_manager.create_pool(base_url)
+                if not await scrape_base_url(page_pool, base_url, seen, data_writer, page_cache, bar_position=index):
+                    return False
                 logging.info(f"Finished processing URL: {base_url}")
-                
-                # Save intermediate results after each base URL is processed
-                save_data_to_csv(all_data_list, f"data/scraped_properties_intermediate_{len(all_property_ids)}_properties.csv")
-                
-                time.sleep(random.uniform(10, 15))
+                return True
             except Exception as url_error:
+                # The other URLs carry on
                 logging.error(f"Error processing URL {base_url}: {url_error}")
-                # Continue with the next URL
-                continue
+                return False
         
-        # Write final data to CSV file
-        save_data_to_csv(all_data_list, "data/scraped_properties.csv")
+        # Process the base URLs at the same time; the per-domain rate limiter still
+        # paces page loads on a site they share
+        url_results = await asyncio.gather(*(process_url(index, base_url) for index, base_url in enumerate(base_urls)))
         
-        # Also save a separate file with expanded sales data (one row per sale)
-        save_expanded_sales_data(all_data_list, "data/scraped_properties_expanded.csv")
+        # Only a run where every base URL was scraped and something was found replaces
+        # the previous output; anything else is kept in the partial files
+        completed = all(url_results) and data_writer.property_count > 0
+        if not completed:
+            logging.error(f"{url_results.count(False)} of {len(base_urls)} base URLs failed and "
+                          f"{data_writer.property_count} properties were scraped; keeping the previous output")
         
         # Calculate and log summary statistics
-        unique_properties = len(all_property_ids)
-        total_sales = sum(data['Sales Count'] for data in all_data_list)
+        unique_properties = len(seen)
+        total_sales = data_writer.sale_count
         logging.info(f"\n{'='*50}")
         logging.info("Scraping Summary:")
         logging.info(f"Total unique properties: {unique_properties}")
         logging.info(f"Total sale records: {total_sales}")
         if unique_properties > 0:
             logging.info(f"Average sales per property: {total_sales/unique_properties:.2f}")
-        logging.info(f"Scraped data has been saved to 'data/scraped_properties.csv'")
-        logging.info(f"Expanded sales data has been saved to 'data/scraped_properties_expanded.csv'")
         logging.info(f"{'='*50}")
         
     except Exception as e:
         logging.critical(f"Critical error in main function: {e}")
-        # Save any data we've collected so far
-        if all_data_list:
-            save_data_to_csv(all_data_list, "data/scraped_properties_error_recovery.csv")
-            logging.info(f"Saved {len(all_data_list)} records to error recovery file")
     
     finally:
-        # Clean up resources
+        # Clean up resources. Each step is tried on its own, so one failing doesn't
+        # leave the others undone. The output only replaces the real CSVs when every
+        # base URL was scraped and properties were found; anything else (including an
+        # error or interrupt) keeps it in partial files
+        if data_writer:
+            try:
+                data_writer.close(complete=completed)
+            except Exception as close_error:
+                logging.error(f"Error saving scraped data: {close_error}")
+        if page_cache:
+            try:
+                page_cache.close()
+            except Exception as close_error:
+                logging.error(f"Error closing page cache: {close_error}")
         try:
-            if 'context' in locals() and context:
-                context.close()
-            if browser:
-                browser.close()
-            if playwright:
-                playwright.stop()
+            await browser_manager.close()
         except Exception as close_error:
-            logging.error(f"Error during cleanup: {close_error}")
+            logging.error(f"Error closing browser: {close_error}")
 
-def save_data_to_csv(data_list: List[Dict], filepath: str):
-    """Save data to a CSV file"""
-    if not data_list:
-        logging.warning(f"No data to save to {filepath}")
-        return
-        
-    os.makedirs(os.path.dirname(filepath), exist_ok=True)
-    csv_columns = ['Property ID', 'Link', 'Address', 'Postal_Code', 'Property_Type', 'Sales', 
-                   'First Sale Type', 'First Sale Date', 'First Sale Price', 
-                   'Sales Count', 'Page Number']
-    
-    try:
-        with open(filepath, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=csv_columns)
-            writer.writeheader()
-            for data in data_list:
-                writer.writerow(data)
-        logging.info(f"Successfully saved {len(data_list)} records to {filepath}")
-    except Exception as e:
-        logging.error(f"Error saving to CSV {filepath}: {e}")
+# Write buffer for the output CSVs (1 MiB instead of the default 8 KiB)
+CSV_BUFFER_SIZE = 1 << 20
 
-def save_expanded_sales_data(data_list: List[Dict], filepath: str):
-    """Save expanded sales data with one row per sale"""
-    if not data_list:
-        logging.warning(f"No data to save to {filepath}")
-        return
+PROPERTY_COLUMNS = ['Property ID', 'Link', 'Address', 'Postal_Code', 'Property_Type', 'Sales', 
+                    'First Sale Type', 'First Sale Date', 'First Sale Price', 
+                    'Sales Count', 'Page Number']
+
+EXPANDED_SALES_COLUMNS = ['Property ID', 'Address', 'Postal_Code', 'Property_Type',
+                          'Sale Type', 'Sale Date', 'Price',
+                          'Sale Index', 'Total Sales']
+
+# Pull CSV rows out of the record dicts in column order with C-level lookups
+get_property_row = itemgetter(*PROPERTY_COLUMNS)
+SALES_COLUMN_INDEX = PROPERTY_COLUMNS.index('Sales')
+get_property_fields = itemgetter('Property ID', 'Address', 'Postal_Code', 'Property_Type')
+get_sale_fields = itemgetter('Sale Type', 'Sale Date', 'Price')
+
+def expand_sales(property_data: Dict) -> List[tuple]:
+    """Expand a property's sales into one row per sale, in EXPANDED_SALES_COLUMNS order"""
+    sales = property_data['Sales']
+    property_fields = get_property_fields(property_data)
+    total_sales = len(sales)
+    return [property_fields + get_sale_fields(sale) + (i + 1, total_sales)
+            for i, sale in enumerate(sales)]
+
+class ScrapedDataWriter:
+    """
+    Streams scraped properties to a CSV file as each page is scraped, together
+    with an expanded CSV holding one row per sale. Both are written to temporary
+    files that only replace the real paths when the scrape completes, so readers
+    never see a partial CSV.
+    """
+    def __init__(self, properties_filepath: str, expanded_filepath: str):
+        os.makedirs(os.path.dirname(properties_filepath), exist_ok=True)
+        os.makedirs(os.path.dirname(expanded_filepath), exist_ok=True)
+        self.properties_filepath = properties_filepath
+        self.expanded_filepath = expanded_filepath
+        # Large buffers so each page's rows go out in a few writes when flushed
+        self.properties_file = open(f"{properties_filepath}.tmp", 'w', newline='', encoding='utf-8', buffering=CSV_BUFFER_SIZE)
+        self.expanded_file = open(f"{expanded_filepath}.tmp", 'w', newline='', encoding='utf-8', buffering=CSV_BUFFER_SIZE)
+        self.properties_writer = csv.writer(self.properties_file)
+        self.expanded_writer = csv.writer(self.expanded_file)
+        self.properties_writer.writerow(PROPERTY_COLUMNS)
+        self.expanded_writer.writerow(EXPANDED_SALES_COLUMNS)
+        self.property_count = 0
+        self.sale_count = 0
         
-    os.makedirs(os.path.dirname(filepath), exist_ok=True)
-    expanded_data = []
-    
-    # Expand the sales data
-    for property_data in data_list:
-        try:
-            sales = json.loads(property_data['Sales'])
-            for i, sale in enumerate(sales):
-                expanded_row = {
-                    'Property ID': property_data['Property ID'],
-                    'Address': property_data['Address'],
-                    'Postal_Code': property_data['Postal_Code'],
-                    'Property_Type': property_data['Property_Type'],
-                    'Sale Type': sale['Sale Type'],
-                    'Sale Date': sale['Sale Date'],
-                    'Price': sale['Price'],
-                    'Sale Index': i + 1,
-                    'Total Sales': len(sales)
-                }
-                expanded_data.append(expanded_row)
-        except Exception as e:
-            logging.error(f"Error expanding sales data for property {property_data['Property ID']}: {e}")
-    
-    # Define columns for the expanded data
-    csv_columns = ['Property ID', 'Address', 'Postal_Code', 'Property_Type',
-                   'Sale Type', 'Sale Date', 'Price',
-                   'Sale Index', 'Total Sales']
-    
-    try:
-        with open(filepath, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=csv_columns)
-            writer.writeheader()
-            for data in expanded_data:
-                writer.writerow(data)
-        logging.info(f"Successfully saved {len(expanded_data)} expanded sales records to {filepath}")
-    except Exception as e:
-        logging.error(f"Error saving expanded data to CSV {filepath}: {e}")
+    def write_page(self, page_data: List[Dict]):
+        for property_data in page_data:
+            # Sales stay a list in memory and are only serialized for the compact CSV
+            row = list(get_property_row(property_data))
+            row[SALES_COLUMN_INDEX] = orjson.dumps(row[SALES_COLUMN_INDEX]).decode()
+            self.properties_writer.writerow(row)
+            self.property_count += 1
+            
+            # parse_containers always gives a record a non-empty list of complete sale
+            # dicts (an N/A sale when none were found), so expansion needs no error path
+            expanded_rows = expand_sales(property_data)
+            self.expanded_writer.writerows(expanded_rows)
+            self.sale_count += len(expanded_rows)
+        
+        # Push the page to the temporary files now, so a crash or kill loses at most the
+        # page in progress
+        self.properties_file.flush()
+        self.expanded_file.flush()
+            
+    def close(self, complete: bool = True):
+        """
+        Sync and close both files. A complete scrape is renamed atomically over the real
+        paths; an incomplete one is kept in '<name>_partial.csv' files next to them,
+        leaving the previous output in place.
+        """
+        saved_paths = []
+        for file, filepath in ((self.properties_file, self.properties_filepath),
+                               (self.expanded_file, self.expanded_filepath)):
+            file.flush()
+            os.fsync(file.fileno())
+            file.close()
+            target = filepath if complete else f"{os.path.splitext(filepath)[0]}_partial.csv"
+            os.replace(file.name, target)
+            saved_paths.append(target)
+        if complete:
+            logging.info(f"Successfully saved {self.property_count} records and {self.sale_count} expanded sales records")
+            logging.info(f"Scraped data has been saved to '{self.properties_filepath}'")
+            logging.info(f"Expanded sales data has been saved to '{self.expanded_filepath}'")
+        else:
+            logging.warning(f"Scrape did not complete; saved {self.property_count} records and {self.sale_count} "
+                            f"expanded sales records to {' and '.join(saved_paths)}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Scrape sold property listings from boligsiden.dk')
+    parser.add_argument('--no-cache', action='store_true', help='Scrape every page again instead of reusing cached pages')
+    args = parser.parse_args()
+    asyncio.run(main(use_cache=not args.no_cache))
@@ -1,9 +1,60 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-import pandas as pd
+import polars as pl
 import os
 
+# Text columns are declared up front so the reader skips inference on them and the
+# join keys always compare as strings; the rest are inferred from the whole file
+PROPERTIES_SCHEMA = {
+    'Property ID': pl.Utf8,
+    'Address': pl.Utf8,
+    'Property_Type': pl.Utf8,
+    'Sale Type': pl.Utf8,
+    'Sale Date': pl.Utf8,
+}
+DETAILS_SCHEMA = {
+    'Property_ID': pl.Utf8,
+}
+
+# Cell values read as missing (the same strings pandas treats as missing by default),
+# so 'N/A' placeholders written by the scrapers count as missing attributes
+NA_VALUES = ['', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan',
+             '1.#IND', '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null']
+
+def read_csv_cached(csv_file, schema_overrides):
+    """
+    Read a CSV through a Parquet copy stored next to it ('<csv_file>.parquet').
+    The copy is used while it is at least as new as the CSV; otherwise the CSV is
+    parsed and the copy rewritten, so repeated merges skip the text parsing.
+    """
+    parquet_file = f"{csv_file}.parquet"
+    if os.path.exists(parquet_file) and os.path.getmtime(parquet_file) >= os.path.getmtime(csv_file):
+        return pl.read_parquet(parquet_file)
+    
+    df = pl.read_csv(csv_file, schema_overrides=schema_overrides, null_values=NA_VALUES,
+                     infer_schema_length=None)
+    try:
+        tmp_file = f"{parquet_file}.tmp"
+        df.write_parquet(tmp_file)
+        os.replace(tmp_file, parquet_file)
+    except OSError as e:
+        print(f"Warning: could not cache {csv_file} as Parquet: {e}")
+    return df
+
+def write_merged_csv(df, output_file):
+    """
+    Write the merged data to CSV with missing values as 'N/A'. The CSV is built in a
+    temporary file next to output_file and renamed over it once complete, so an
+    interrupted run never leaves a half-written output behind.
+    """
+    tmp_file = f"{output_file}.tmp"
+    # Polars formats and writes the rows in parallel batches
+    df.write_csv(tmp_file, null_value='N/A')
+    with open(tmp_file, 'rb+') as out:
+        os.fsync(out.fileno())
+    os.replace(tmp_file, output_file)
+
 def merge_property_data(properties_file, details_file, output_file):
     """
     Merge property transaction data with property attributes data.
@@ -14,14 +65,14 @@ def merge_property_data(properties_file, details_file, output_file):
         output_file: Path to save the merged output CSV
     """
     print(f"Reading transaction data from {properties_file}...")
-    properties_df = pd.read_csv(properties_file)
+    properties_df = read_csv_cached(properties_file, PROPERTIES_SCHEMA)
     
     print(f"Reading property details from {details_file}...")
-    details_df = pd.read_csv(details_file)
+    details_df = read_csv_cached(details_file, DETAILS_SCHEMA)
     
     # Check the column names in each dataframe
-    print(f"\nTransaction data columns: {properties_df.columns.tolist()}")
-    print(f"Property details columns: {details_df.columns.tolist()}")
+    print(f"\nTransaction data columns: {properties_df.columns}")
+    print(f"Property details columns: {details_df.columns}")
     
     # Get initial row counts
     properties_count = len(properties_df)
@@ -29,18 +80,10 @@ def merge_property_data(properties_file, details_file, output_file):
     print(f"\nTransaction records: {properties_count}")
     print(f"Property records: {details_count}")
     
-    # Rename the Property_ID column in the details dataframe to match the properties dataframe
-    details_df = details_df.rename(columns={'Property_ID': 'Property ID'})
-    
     # Perform a left join to keep all transaction records
     print("\nMerging datasets...")
-    merged_df = pd.merge(
-        properties_df, 
-        details_df, 
-        on='Property ID', 
-        how='left',
-        suffixes=('', '_details')
-    )
+    merged_df = properties_df.join(details_df, left_on='Property ID', right_on='Property_ID',
+                                   how='left', suffix='_details')
     
     # Get the merged row count
     merged_count = len(merged_df)
@@ -49,16 +92,12 @@ def merge_property_data(properties_file, details_file, output_file):
     # Check for missing property attributes
     # Count rows where any property attribute is missing
     property_attrs = ['Living_Area', 'Heating_Type', 'Roof_Type', 'Wall_Material']
-    missing_attrs = merged_df[property_attrs].isna().any(axis=1).sum()
+    missing_attrs = merged_df.select(pl.any_horizontal(pl.col(property_attrs).is_null()).sum()).item()
     print(f"Transactions with missing property attributes: {missing_attrs} ({missing_attrs / merged_count:.2%})")
     
-    # Fill missing values with 'N/A'
-    print("\nFilling missing values with 'N/A'...")
-    merged_df = merged_df.fillna('N/A')
-    
     # Save the merged dataframe to a new CSV file
     print(f"\nSaving merged data to {output_file}...")
-    merged_df.to_csv(output_file, index=False)
+    write_merged_csv(merged_df, output_file)
     
     print(f"\nSuccess! Merged data saved to {output_file}")
     print(f"Total records: {merged_count}")
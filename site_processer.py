@@ -1,154 +1,284 @@
 import logging
-from bs4 import BeautifulSoup
+from selectolax.lexbor import LexborHTMLParser
 import os
 import time
 import random
 import re
+try:
+    # RE2 matches in linear time, which matters for the patterns scanned over whole pages
+    import re2 as page_re
+except ImportError:
+    page_re = re
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
 import datetime
 from selenium.webdriver.common.by import By
 from selenium import webdriver
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
 import csv
+import argparse
+import queue
+from concurrent.futures import ThreadPoolExecutor
+import atexit
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-# Compile regex patterns once for better performance
+DEFAULT_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/96.0.4664.110 Safari/537.36'
+
+# Starting Chrome is the slowest part of fetching a property, so drivers are kept in a
+# pool and reused across properties instead of being started and quit for each one
+driver_pool = queue.Queue()
+pooled_drivers = []
+
+# Path of the chromedriver resolved by Selenium Manager for the first driver; later
+# drivers reuse it instead of running the driver lookup again
+chromedriver_path = None
+
+# Default number of properties fetched at the same time, each with its own pooled driver
+MAX_WORKERS = 4
+
+# Write buffer for the output CSV (1 MiB instead of the default 8 KiB)
+CSV_BUFFER_SIZE = 1 << 20
+
+# Compile regex patterns once for better performance. They are searched over the whole
+# page source, so they use RE2 when available (case-insensitivity is inline, (?i),
+# since RE2 takes no re flags)
 REGEX_PATTERNS = {
     'living_area': [
-        re.compile(r'(?:Boligareal|Bolig|Areal|Living area|Area)(?:\s*:)?\s*(\d+(?:[,.]\d+)?)\s*(?:m²|kvm|sqm)', re.IGNORECASE),
-        re.compile(r'(\d+(?:[,.]\d+)?)\s*(?:m²|kvm|sqm)(?:\s*bolig|-areal|boligareal|living area|area)', re.IGNORECASE),
-        re.compile(r'areal(?:\s*:)?\s*(\d+(?:[,.]\d+)?)\s*(?:m²|kvm|sqm)', re.IGNORECASE),
-        re.compile(r'(?:etageareal|ejendomsareal)(?:\s*:)?\s*(\d+(?:[,.]\d+)?)\s*(?:m²|kvm|sqm)', re.IGNORECASE)
+        page_re.compile(r'(?i)(?:Boligareal|Bolig|Areal|Living area|Area)(?:\s*:)?\s*(\d+(?:[,.]\d+)?)\s*(?:m²|kvm|sqm)'),
+        page_re.compile(r'(?i)(\d+(?:[,.]\d+)?)\s*(?:m²|kvm|sqm)(?:\s*bolig|-areal|boligareal|living area|area)'),
+        page_re.compile(r'(?i)areal(?:\s*:)?\s*(\d+(?:[,.]\d+)?)\s*(?:m²|kvm|sqm)'),
+        page_re.compile(r'(?i)(?:etageareal|ejendomsareal)(?:\s*:)?\s*(\d+(?:[,.]\d+)?)\s*(?:m²|kvm|sqm)')
     ],
     'rooms': [
-        re.compile(r'(?:Værelser|Rum|Rooms|Badeværelse|Bathroom|Toilet)(?:\s*:)?\s*(\d+(?:[,.]\d+)?)', re.IGNORECASE),
-        re.compile(r'(\d+(?:[,.]\d+)?)\s*(?:værelser|vær|rum|rooms|badeværelse|bathroom|toilet)', re.IGNORECASE),
-        re.compile(r'antal\s*(?:rum|værelser|badeværelse|toilet)(?:\s*:)?\s*(\d+(?:[,.]\d+)?)', re.IGNORECASE),
-        re.compile(r'(?:Værelser|Rum|Rooms)(?:\s*:)?\s*(\d+(?:[,.]\d+)?)', re.IGNORECASE),
-        re.compile(r'(\d+(?:[,.]\d+)?)\s*(?:værelser|rum|rooms)', re.IGNORECASE)
+        page_re.compile(r'(?i)(?:Værelser|Rum|Rooms|Badeværelse|Bathroom|Toilet)(?:\s*:)?\s*(\d+(?:[,.]\d+)?)'),
+        page_re.compile(r'(?i)(\d+(?:[,.]\d+)?)\s*(?:værelser|vær|rum|rooms|badeværelse|bathroom|toilet)'),
+        page_re.compile(r'(?i)antal\s*(?:rum|værelser|badeværelse|toilet)(?:\s*:)?\s*(\d+(?:[,.]\d+)?)'),
+        page_re.compile(r'(?i)(?:Værelser|Rum|Rooms)(?:\s*:)?\s*(\d+(?:[,.]\d+)?)'),
+        page_re.compile(r'(?i)(\d+(?:[,.]\d+)?)\s*(?:værelser|rum|rooms)')
     ],
     'price': [
-        re.compile(r'(?:Pris|Kontantpris|Price|Asking price)(?:\s*:)?\s*(?:kr\.?)?\s*([\d.]+)(?:\s*kr\.?)', re.IGNORECASE),
-        re.compile(r'(?:kr\.?)\s*([\d.]+)(?:\s*kr\.?)', re.IGNORECASE),
-        re.compile(r'(?:salgspris|købspris|handelspris)(?:\s*:)?\s*(?:kr\.?)?\s*([\d.]+)', re.IGNORECASE)
+        page_re.compile(r'(?i)(?:Pris|Kontantpris|Price|Asking price)(?:\s*:)?\s*(?:kr\.?)?\s*([\d.]+)(?:\s*kr\.?)'),
+        page_re.compile(r'(?i)(?:kr\.?)\s*([\d.]+)(?:\s*kr\.?)'),
+        page_re.compile(r'(?i)(?:salgspris|købspris|handelspris)(?:\s*:)?\s*(?:kr\.?)?\s*([\d.]+)')
     ]
 }
 
-def extract_property_details(soup):
+# Broader price and area patterns searched after REGEX_PATTERNS
+PAGE_PRICE_RE = page_re.compile(r'(?i)(?:kr\.?|DKK)\s*([\d.]+)')
+PAGE_AREA_RE = page_re.compile(r'(\d+)\s*(?:m²|kvm)')
+
+# CSS selectors for the page-scraping fallback. The section and row selectors are
+# each joined into one grouped selector, so a page (or section) is walked once
+# instead of once per selector
+DETAIL_SECTION_SELECTOR = ", ".join([
+    ".property-details", ".property-specs", ".property-info", 
+    "[class*='details']", "[class*='specs']", "[class*='info']",
+    "[id*='details']", "[id*='specifications']", "[id*='info']",
+    "section", "article", ".facts-table", ".estateFacts", 
+    "div.scroll-mt-0", "div[id='oversigt']", 
+    "div.pt-22", ".pt-22", 
+    "div.flex", "div.space-y-2",
+    "div.whitespace-nowrap"
+])
+DETAIL_ROW_SELECTOR = ", ".join([
+    "tr", ".fact-row", ".detail-row", "li", ".item", 
+    "[class*='row']", "[class*='item']", "[class*='field']",
+    "div.row", "div.flex", 
+    "div.inline-flex", "div.space-y-2", "div.justify-between",
+    "div.mt-4", "div.mb-6", "div.whitespace-nowrap",
+    "div[class*='tag']", "span[class*='text']"
+])
+LABEL_SELECTORS = [
+    ".label", ".key", ".name", "dt", "th", "[class*='label']", "[class*='key']", "label", "div.text-xs"
+]
+VALUE_SELECTORS = [
+    ".value", ".val", ".data", "dd", "td", "[class*='value']", "[class*='val']",
+    "div.text-sm", "div.text-blue-900", "span.text-blue-900"
+]
+
+# Common Danish property terms in page labels, mapped to English detail keys
+DANISH_TO_ENGLISH = {
+    'boligareal': 'living_area',
+    'areal': 'area',
+    'værelser': 'rooms',
+    'rum': 'rooms',
+    'badeværelse': 'rooms',
+    'toilet': 'rooms',
+    'kontantpris': 'price',
+    'pris': 'price',
+    'ejerudgift': 'owner_cost',
+    'brutto/netto': 'gross_net',
+    'udbetaling': 'down_payment',
+    'grundskyld': 'property_tax',
+    'boligtype': 'property_type',
+    'etage': 'floor',
+    'kælder': 'basement',
+    'liggetid': 'days_on_market',
+    'varme': 'heating_type',
+    'tag': 'roof_type',
+    'ydervæg': 'wall_material',
+    'ydermur': 'wall_material'
+}
+
+# With pyahocorasick, all the terms are matched in one pass over a label; each term
+# carries its position in DANISH_TO_ENGLISH so the first term in dict order still wins
+if ahocorasick is not None:
+    DANISH_TERM_AUTOMATON = ahocorasick.Automaton()
+    for priority, (danish, english) in enumerate(DANISH_TO_ENGLISH.items()):
+        DANISH_TERM_AUTOMATON.add_word(danish, (priority, english))
+    DANISH_TERM_AUTOMATON.make_automaton()
+else:
+    DANISH_TERM_AUTOMATON = None
+
+def map_danish_label(label):
+    """Return the English key of the first DANISH_TO_ENGLISH term found in label, or None"""
+    if DANISH_TERM_AUTOMATON is None:
+        for danish, english in DANISH_TO_ENGLISH.items():
+            if danish in label:
+                return english
+        return None
+    match = min((value for _, value in DANISH_TERM_AUTOMATON.iter(label)), default=None)
+    return match[1] if match else None
+
+# Details extract_property_details keeps from the page's detail rows
+DETAIL_TARGET_KEYS = frozenset({'living_area', 'rooms', 'price'})
+
+# Icon class words and the detail they label, checked in order against an SVG's class string
+SVG_CLASS_LABELS = (
+    ('floor', 'living_area'),
+    ('home', 'living_area'),
+    ('bed', 'rooms'),
+    ('bath', 'rooms'),
+    ('toilet', 'rooms'),
+)
+
+# Numbers in detail row text, for rows recognised by their m² or room wording
+ROW_AREA_RE = re.compile(r'(\d+)\s*m²')
+ROW_ROOMS_RE = re.compile(r'(\d+)\s*(?:værelser|badeværelse|toilet)')
+
+def is_descendant(node, ancestor):
+    """Check whether node lies inside ancestor in the Lexbor tree"""
+    parent = node.parent
+    while parent is not None:
+        if parent.mem_id == ancestor.mem_id:
+            return True
+        parent = parent.parent
+    return False
+
+def extract_property_details(tree):
     """
-    Extract property details from the soup object.
+    Extract property details from the page's Lexbor tree (a BeautifulSoup object
+    is also accepted and re-parsed).
     Returns a dictionary of property details.
     """
+    if not isinstance(tree, LexborHTMLParser):
+        tree = LexborHTMLParser(str(tree))
+    
     processed_details = {}
     
-    # Try multiple selectors for detail sections
+    # Find the detail sections and their rows with one grouped query each. Lexbor returns
+    # an element once per selector it matches, and rows of nested sections are found
+    # again from the outer section, so both are kept in document order without duplicates
     detail_sections = []
-    for selector in [
-        ".property-details", ".property-specs", ".property-info", 
-        "[class*='details']", "[class*='specs']", "[class*='info']",
-        "[id*='details']", "[id*='specifications']", "[id*='info']",
-        "section", "article", ".facts-table", ".estateFacts", 
-        "div.scroll-mt-0", "div[id='oversigt']", 
-        "div.pt-22", ".pt-22", 
-        "div.flex", "div.space-y-2",
-        "div.whitespace-nowrap"
-    ]:
-        sections = soup.select(selector)
-        if sections:
-            detail_sections.extend(sections)
-            logging.info(f"Found {len(sections)} detail sections with selector: {selector}")
+    seen_sections = set()
+    for section in tree.css(DETAIL_SECTION_SELECTOR):
+        if section.mem_id not in seen_sections:
+            seen_sections.add(section.mem_id)
+            detail_sections.append(section)
     
-    # Try various selectors for detail rows
     detail_rows = []
+    seen_rows = set()
     for section in detail_sections:
-        for row_selector in [
-            "tr", ".fact-row", ".detail-row", "li", ".item", 
-            "[class*='row']", "[class*='item']", "[class*='field']",
-            "div.row", "div.flex", 
-            "div.inline-flex", "div.space-y-2", "div.justify-between",
-            "div.mt-4", "div.mb-6", "div.whitespace-nowrap",
-            "div[class*='tag']", "span[class*='text']"
-        ]:
-            rows = section.select(row_selector)
-            if rows:
-                detail_rows.extend(rows)
-                logging.info(f"Found {len(rows)} detail rows with selector: {row_selector}")
+        for row in section.css(DETAIL_ROW_SELECTOR):
+            if row.mem_id not in seen_rows:
+                seen_rows.add(row.mem_id)
+                detail_rows.append(row)
+    logging.debug("Found %d detail rows in %d detail sections", len(detail_rows), len(detail_sections))
     
-    # Process each detail row
-    for row in detail_rows:
+    # Process each detail row, last first: a later row used to overwrite an earlier one with
+    # the same label, so the first value found walking backwards is kept and the walk stops
+    # once every stored field has one
+    for row in reversed(detail_rows):
         try:
             # Try to find label and value divs in various formats
             label_div = None
             value_div = None
             
             # Method 1: Common class names for label and value
-            for label_selector in [".label", ".key", ".name", "dt", "th", "[class*='label']", "[class*='key']", "label", "div.text-xs"]:
-                if not label_div:
-                    label_div = row.select_one(label_selector)
+            for label_selector in LABEL_SELECTORS:
+                label_div = row.css_first(label_selector)
+                if label_div:
+                    break
             
-            for value_selector in [".value", ".val", ".data", "dd", "td", "[class*='value']", "[class*='val']", "div.text-sm", "div.text-blue-900", "span.text-blue-900"]:
-                if not value_div:
-                    value_div = row.select_one(value_selector)
+            for value_selector in VALUE_SELECTORS:
+                value_div = row.css_first(value_selector)
+                if value_div:
+                    break
             
             # Method 2: If not found, look for strong/span pairs
             if not label_div or not value_div:
-                if row.find("strong") and row.find("span"):
-                    label_div = row.find("strong")
-                    spans = row.find_all("span")
-                    if spans:
-                        for span in spans:
-                            if label_div not in span.descendants:
-                                value_div = span
-                                break
+                strong = row.css_first("strong")
+                if strong and row.css_first("span"):
+                    label_div = strong
+                    for span in row.css("span"):
+                        if not is_descendant(label_div, span):
+                            value_div = span
+                            break
             
             # Method 3: Look for h3/p or h4/p pairs
             if not label_div or not value_div:
-                headers = row.select("h3, h4, h5")
-                if headers and row.find("p"):
-                    label_div = headers[0]
-                    value_div = row.find("p")
+                header = row.css_first("h3, h4, h5")
+                paragraph = row.css_first("p")
+                if header and paragraph:
+                    label_div = header
+                    value_div = paragraph
             
             # Method 4: Check for SVG icons with adjacent text
             if not label_div or not value_div:
-                if row.find("svg") and (row.find("span") or row.get_text().strip()):
-                    svg = row.find("svg")
-                    if svg and svg.next_sibling:
-                        if isinstance(svg.next_sibling, str) and svg.next_sibling.strip():
-                            value_div = svg.next_sibling
-                        elif svg.next_sibling.name == "span":
-                            value_div = svg.next_sibling
+                # Read the row's text once; Method 5 runs only if this one did and reuses it
+                row_text = row.text().strip()
+                svg = row.css_first("svg")
+                if svg and (row.css_first("span") or row_text):
+                    sibling = svg.next
+                    if sibling is not None:
+                        if sibling.tag == '-text':
+                            if sibling.text_content.strip():
+                                value_div = sibling.text_content
+                        elif sibling.tag == "span":
+                            value_div = sibling
                             
-                    if svg and svg.get('class'):
-                        svg_classes = ' '.join(svg.get('class'))
-                        if 'floor' in svg_classes or 'home' in svg_classes:
-                            label_div = "living_area"
-                        elif 'bed' in svg_classes or 'bedroom' in svg_classes or 'bath' in svg_classes or 'toilet' in svg_classes:
-                            label_div = "rooms"
+                    svg_classes = svg.attributes.get('class')
+                    if svg_classes:
+                        label_div = next((label for word, label in SVG_CLASS_LABELS if word in svg_classes), label_div)
             
             # Method 5: For div.inline-flex elements, check for property-specific patterns
             if not label_div or not value_div:
-                row_text = row.get_text().strip()
                 if 'm²' in row_text:
                     label_div = "living_area"
-                    match = re.search(r'(\d+)\s*m²', row_text)
+                    match = ROW_AREA_RE.search(row_text)
                     if match:
                         value_div = match.group(1)
                 elif 'værelser' in row_text or 'badeværelse' in row_text or 'toilet' in row_text:
                     label_div = "rooms"
-                    match = re.search(r'(\d+)\s*(?:værelser|badeværelse|toilet)', row_text)
+                    match = ROW_ROOMS_RE.search(row_text)
                     if match:
                         value_div = match.group(1)
                 
             # Method 6: Last resort - use first and second divs or spans
             if not label_div or not value_div:
-                divs = row.find_all("div", recursive=False)
+                children = list(row.iter())
+                divs = [child for child in children if child.tag == "div"]
                 if len(divs) >= 2:
                     label_div = divs[0]
                     value_div = divs[1]
                 else:
-                    spans = row.find_all("span", recursive=False)
+                    spans = [child for child in children if child.tag == "span"]
                     if len(spans) >= 2:
                         label_div = spans[0]
                         value_div = spans[1]
@@ -159,47 +289,19 @@ def extract_property_details(soup):
                 if isinstance(label_div, str):
                     label = label_div
                 else:
-                    label = label_div.get_text().strip().lower()
+                    label = label_div.text().strip().lower()
                 
                 # Handle the case where value_div is a string (from our detection logic)
                 if isinstance(value_div, str):
                     value = value_div.strip()
                 else:
-                    value = value_div.get_text().strip()
+                    value = value_div.text().strip()
                 
                 # Clean up the label by removing any trailing colons
                 label = label.rstrip(":").strip()
                 
-                # Map common Danish property terms to English
-                danish_to_english = {
-                    'boligareal': 'living_area',
-                    'areal': 'area',
-                    'værelser': 'rooms',
-                    'rum': 'rooms',
-                    'badeværelse': 'rooms',
-                    'toilet': 'rooms',
-                    'kontantpris': 'price',
-                    'pris': 'price',
-                    'ejerudgift': 'owner_cost',
-                    'brutto/netto': 'gross_net',
-                    'udbetaling': 'down_payment',
-                    'grundskyld': 'property_tax',
-                    'boligtype': 'property_type',
-                    'etage': 'floor',
-                    'kælder': 'basement',
-                    'liggetid': 'days_on_market',
-                    'varme': 'heating_type',
-                    'tag': 'roof_type',
-                    'ydervæg': 'wall_material',
-                    'ydermur': 'wall_material'
-                }
-                
                 # Map the label to English if possible
-                mapped_label = None
-                for danish, english in danish_to_english.items():
-                    if danish in label:
-                        mapped_label = english
-                        break
+                mapped_label = map_danish_label(label)
                 
                 # Use the mapped label or the original if no mapping found
                 if mapped_label:
@@ -211,19 +313,28 @@ def extract_property_details(soup):
                 # Handle common units and formats
                 if 'm²' in value or 'kvm' in value:
                     value = clean_numerical_value(value, 'area')
-                elif 'kr' in value.lower() or 'dkk' in value.lower() or '€' in value:
-                    value = clean_numerical_value(value, 'price')
+                else:
+                    value_lower = value.lower()
+                    if 'kr' in value_lower or 'dkk' in value_lower or '€' in value:
+                        value = clean_numerical_value(value, 'price')
                 
                 # Store the value in the processed details
-                if label in ['living_area', 'rooms', 'price']:
+                if label in DETAIL_TARGET_KEYS and label not in processed_details:
                     processed_details[label] = value
+                    if len(processed_details) == len(DETAIL_TARGET_KEYS):
+                        break
                 
         except Exception as e:
-            logging.error(f"Error processing detail row: {str(e)}")
+            logging.error("Error processing detail row: %s", e)
             continue
     
     return processed_details
 
+# Standard address format: Street, Postal_Code City[, additional location info]
+ADDRESS_RE = re.compile(r'^(.*?),?\s+(\d{4})\s+([^,]+)(?:,\s*(.+))?$')
+# Any 4-digit postal code, for addresses not in the standard format
+POSTAL_CODE_RE = re.compile(r'(\d{4})')
+
 def parse_address(address_text):
     """Parse address into street, postal code, and city with improved handling."""
     address_parts = {
@@ -236,7 +347,7 @@ def parse_address(address_text):
         return address_parts
         
     # First try to match the standard format: Street, Postal_Code City
-    match = re.match(r'^(.*?),?\s+(\d{4})\s+([^,]+)(?:,\s*(.+))?$', address_text)
+    match = ADDRESS_RE.match(address_text)
     
     if match:
         street = match.group(1).strip()
@@ -252,7 +363,7 @@ def parse_address(address_text):
         address_parts['City'] = city
     else:
         # Fallback: Try to find postal code and work backwards/forwards
-        postal_match = re.search(r'(\d{4})', address_text)
+        postal_match = POSTAL_CODE_RE.search(address_text)
         if postal_match:
             postal = postal_match.group(1)
             parts = address_text.split(postal)
@@ -271,58 +382,59 @@ def parse_address(address_text):
     
     return address_parts
 
+# Accepts Didomi cookie consent through its API, or by clicking or hiding its popup
+DIDOMI_CONSENT_JS = """
+try {
+    // Try to auto-accept all cookies via Didomi API if available
+    if (window.Didomi) {
+        console.log("Didomi found, setting consent...");
+        window.didomiSettings = {
+            notice: {
+                enable: false
+            }
+        };
+        window.Didomi.setUserAgreeToAll();
+
+        // Hide popup if still present
+        var popup = document.getElementById('didomi-popup');
+        if (popup) {
+            popup.style.display = 'none';
+            console.log("Hid Didomi popup");
+        }
+        return true;
+    }
+
+    // If Didomi object not available, try to click the accept button
+    var acceptButtons = document.querySelectorAll('button.didomi-button-highlight, button.didomi-button-accept, #didomi-notice-agree-button');
+    for (var i = 0; i < acceptButtons.length; i++) {
+        if (acceptButtons[i].offsetParent !== null) {  // Check if visible
+            console.log("Clicking accept button:", acceptButtons[i]);
+            acceptButtons[i].click();
+            return true;
+        }
+    }
+
+    // If we reach here, try to hide the popup elements
+    var elements = document.querySelectorAll('#didomi-popup, .didomi-popup-backdrop, .didomi-notice-popup');
+    var removed = false;
+    for (var j = 0; j < elements.length; j++) {
+        elements[j].style.display = 'none';
+        console.log("Hid Didomi element");
+        removed = true;
+    }
+
+    return removed;
+} catch (e) {
+    console.error("Error in Didomi consent handling:", e);
+    return false;
+}
+"""
+
 def handle_didomi_consent(driver):
     """Handle Didomi cookie consent using direct JavaScript methods to bypass UI interactions"""
     try:
         # Try to set Didomi cookies and preferences using JavaScript
-        didomi_script = """
-        try {
-            // Try to auto-accept all cookies via Didomi API if available
-            if (window.Didomi) {
-                console.log("Didomi found, setting consent...");
-                window.didomiSettings = {
-                    notice: {
-                        enable: false
-                    }
-                };
-                window.Didomi.setUserAgreeToAll();
-                
-                // Hide popup if still present
-                var popup = document.getElementById('didomi-popup');
-                if (popup) {
-                    popup.style.display = 'none';
-                    console.log("Hid Didomi popup");
-                }
-                return true;
-            }
-            
-            // If Didomi object not available, try to click the accept button
-            var acceptButtons = document.querySelectorAll('button.didomi-button-highlight, button.didomi-button-accept, #didomi-notice-agree-button');
-            for (var i = 0; i < acceptButtons.length; i++) {
-                if (acceptButtons[i].offsetParent !== null) {  // Check if visible
-                    console.log("Clicking accept button:", acceptButtons[i]);
-                    acceptButtons[i].click();
-                    return true;
-                }
-            }
-            
-            // If we reach here, try to hide the popup elements
-            var elements = document.querySelectorAll('#didomi-popup, .didomi-popup-backdrop, .didomi-notice-popup');
-            var removed = false;
-            for (var j = 0; j < elements.length; j++) {
-                elements[j].style.display = 'none';
-                console.log("Hid Didomi element");
-                removed = true;
-            }
-            
-            return removed;
-        } catch (e) {
-            console.error("Error in Didomi consent handling:", e);
-            return false;
-        }
-        """
-        
-        result = driver.execute_script(didomi_script)
+        result = driver.execute_script(DIDOMI_CONSENT_JS)
         if result:
             logging.info("Successfully handled Didomi consent via JavaScript")
             time.sleep(1)  # Allow time for changes to take effect
@@ -332,6 +444,185 @@ def handle_didomi_consent(driver):
         logging.warning(f"Error in JavaScript Didomi consent handling: {str(e)}")
         return False
 
+# XPath selectors for the 'Se flere detaljer' button, tried in order
+DETAIL_BUTTON_SELECTORS = [
+    "//button[contains(., 'Se flere detaljer')]",
+    "//button[contains(., 'detaljer')]",
+    "//span[contains(., 'Se flere detaljer')]/parent::button",
+    "//button[contains(@class, 'text-blue-900')][.//span[contains(text(), 'Se flere detaljer')]]",
+    "//button[contains(@class, 'flex justify-center items-center')][.//span[contains(text(), 'Se flere detaljer')]]",
+    "//div[contains(@class, 'sm:hidden')]//button[.//span[contains(text(), 'Se flere detaljer')]]",
+    "//div[contains(@class, 'hidden sm:flex')]//button[.//span[contains(text(), 'Se flere detaljer')]]"
+]
+
+# XPath selectors for the detail rows in the modal, tried in order
+MODAL_ROW_SELECTORS = [
+    "//div[@id='modal-root']//div[contains(@class, 'divide-y')]/div[contains(@class, 'flex')]",
+    "//div[contains(@class, 'modal')]//div[contains(@class, 'divide-y')]/div",
+    "//div[contains(@role, 'dialog')]//div[contains(@class, 'divide-y')]/div",
+    "//div[contains(@role, 'dialog')]//div[contains(@class, 'grid')]/div",
+    "//div[contains(@id, 'modal')]//tbody/tr",
+    "//div[contains(@class, 'modal')]//div[contains(@class, 'flex justify-between')]"
+]
+
+# Clicks the first displayed 'Se flere detaljer' button matched by the XPath selectors
+# (tried in order) in one script call, instead of a find_elements round trip per selector
+# and an is_displayed round trip per button. Returns whether a button was clicked
+CLICK_DETAIL_BUTTON_JS = """
+const selectors = arguments[0];
+const isDisplayed = (element) =>
+    element.getClientRects().length > 0 && getComputedStyle(element).visibility !== 'hidden';
+for (const selector of selectors) {
+    const matches = document.evaluate(selector, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    for (let i = 0; i < matches.snapshotLength; i++) {
+        const button = matches.snapshotItem(i);
+        if (isDisplayed(button)) {
+            button.click();
+            return true;
+        }
+    }
+}
+return false;
+"""
+
+# Reads the modal's detail rows in one script call: the rows of the first XPath selector
+# that matches any, each as its text plus the text of its first label and value element
+# (null when there is none), instead of three WebDriver round trips per row
+MODAL_ROWS_JS = """
+const selectors = arguments[0];
+const first = (xpath, row) =>
+    document.evaluate(xpath, row, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+for (const selector of selectors) {
+    const matches = document.evaluate(selector, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    if (matches.snapshotLength === 0) {
+        continue;
+    }
+    const rows = [];
+    for (let i = 0; i < matches.snapshotLength; i++) {
+        const row = matches.snapshotItem(i);
+        const label = first('.//div[1] | .//th | .//dt', row);
+        const value = first('.//div[2] | .//td | .//dd', row);
+        rows.push({
+            text: row.innerText,
+            label: label ? label.innerText : null,
+            value: value ? value.innerText : null,
+        });
+    }
+    return rows;
+}
+return [];
+"""
+
+# Danish modal labels mapped to standardized English field names
+MODAL_FIELD_MAPPING = {
+    'Seneste ombygningsår': 'Last_Remodel_Year',
+    'Antal plan og etage': 'Floor_Count',
+    'Antal plan': 'Floor_Count',
+    'Etage': 'Floor_Count',
+    'Varmeinstallation': 'Heating_Type',
+    'Varme': 'Heating_Type',
+    'Ydervægge': 'Wall_Material',
+    'Ydermur': 'Wall_Material',
+    'Vægtet areal': 'Weighted_Area',
+    'Tagtype': 'Roof_Type',
+    'Tag': 'Roof_Type',
+    'Boligareal': 'Living_Area',
+    'Areal': 'Living_Area',
+    'Antal værelser': 'Rooms',
+    'Værelser': 'Rooms',
+    'Boligtype': 'Property_Type',
+    'Ejendomstype': 'Property_Type',
+    'Type': 'Property_Type',
+    'Energimærke': 'Energy_Label',
+    'Energimærkning': 'Energy_Label'
+}
+
+# The same mapping with lowercased keys, so rows are matched case-insensitively without
+# lowercasing every key again for every row
+MODAL_FIELD_MAPPING_LOWER = {danish.lower(): english for danish, english in MODAL_FIELD_MAPPING.items()}
+
+# Numbers in modal and main-page field texts
+DECIMAL_RE = re.compile(r'(\d+(?:[,.]\d+)?)')
+INTEGER_RE = re.compile(r'(\d+)')
+PRICE_NUMBER_RE = re.compile(r'([\d.,]+)')
+POSTAL_CITY_RE = re.compile(r'(\d{4})\s+(.*)')
+
+# XPath selectors for fields shown on the main page, tried in order
+PROPERTY_TYPE_SELECTORS = [
+    "//span[contains(@class, 'text-gray-700')][1]",
+    "//p[contains(@class, 'text-xs')]/span[contains(@class, 'text-gray-700')]",
+    "//div[contains(@class, 'text-xs')]//span[contains(@class, 'text-gray-700')]"
+]
+
+ADDRESS_SELECTORS = [
+    "//h1[contains(@class, 'text-blue-900')]//span[contains(@class, 'text-lg')]",
+    "//h1[contains(@class, 'text-blue-900')]/span[1]",
+    "//h1[contains(@class, 'space-y-1')]/span[1]"
+]
+
+CITY_POSTAL_SELECTORS = [
+    "//h1[contains(@class, 'text-blue-900')]//span[contains(@class, 'block')]",
+    "//h1[contains(@class, 'space-y-1')]/span[2]"
+]
+
+PRICE_SELECTORS = [
+    "//h2[contains(@class, 'text-blue-900')]",
+    "//div[contains(@class, 'text-blue-900')][contains(@class, 'text-28px')]",
+    "//h2[contains(@class, 'text-28px')]"
+]
+
+LIVING_AREA_SELECTORS = [
+    "//span[contains(text(), 'm²')]",
+    "//div[contains(@class, 'inline-flex')][contains(., 'm²')]//span[contains(@class, 'text-blue-900')]"
+]
+
+ROOMS_SELECTORS = [
+    "//span[contains(text(), 'værelser')]",
+    "//div[contains(@class, 'inline-flex')][contains(., 'værelser')]//span[contains(@class, 'text-blue-900')]"
+]
+
+# XPath selectors for each field read from the main page
+PAGE_FIELD_SELECTORS = {
+    'Property_Type': PROPERTY_TYPE_SELECTORS,
+    'Address': ADDRESS_SELECTORS,
+    'City_Postal': CITY_POSTAL_SELECTORS,
+    'Price': PRICE_SELECTORS,
+    'Living_Area': LIVING_AREA_SELECTORS,
+    'Rooms': ROOMS_SELECTORS
+}
+
+# Reads the text of every element matched by every field's XPath selectors in one script
+# call, instead of a find_elements round trip per selector and a text round trip per
+# element. Returns, for each field, one list of texts per selector in the selectors' order
+FIELD_TEXTS_JS = """
+const texts = (selector) => {
+    const matches = document.evaluate(selector, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    const result = [];
+    for (let i = 0; i < matches.snapshotLength; i++) {
+        result.push(matches.snapshotItem(i).innerText || '');
+    }
+    return result;
+};
+const fields = {};
+for (const [field, selectors] of Object.entries(arguments[0])) {
+    fields[field] = selectors.map(texts);
+}
+return fields;
+"""
+
+def first_match_texts(texts_per_selector):
+    """Texts matched by the first selector that matched any element"""
+    return next((texts for texts in texts_per_selector if texts), [])
+
+# XPath selectors for the modal's close button
+CLOSE_BUTTON_SELECTORS = [
+    "//button[contains(text(), 'Luk')]", 
+    "//button[contains(text(), 'Ok')]", 
+    "//button[contains(text(), 'Lukk')]",
+    "//div[@id='modal-root']//button[contains(@class, 'float-right')]",
+    "//div[contains(@role, 'dialog')]//button"
+]
+
 def extract_modal_data(driver):
     """
     Extracts property data from the modal dialog that appears after clicking 'Se flere detaljer'.
@@ -339,32 +630,11 @@ def extract_modal_data(driver):
     try:
         # Find and click the "Se flere detaljer" button
         try:
-            # Try multiple selectors to find the button
-            detail_button_selectors = [
-                "//button[contains(., 'Se flere detaljer')]",
-                "//button[contains(., 'detaljer')]",
-                "//span[contains(., 'Se flere detaljer')]/parent::button",
-                "//button[contains(@class, 'text-blue-900')][.//span[contains(text(), 'Se flere detaljer')]]",
-                "//button[contains(@class, 'flex justify-center items-center')][.//span[contains(text(), 'Se flere detaljer')]]",
-                "//div[contains(@class, 'sm:hidden')]//button[.//span[contains(text(), 'Se flere detaljer')]]",
-                "//div[contains(@class, 'hidden sm:flex')]//button[.//span[contains(text(), 'Se flere detaljer')]]"
-            ]
-            
-            button_found = False
-            for selector in detail_button_selectors:
-                buttons = driver.find_elements(By.XPATH, selector)
-                for button in buttons:
-                    if button.is_displayed():
-                        logging.info("Found 'Se flere detaljer' button, clicking...")
-                        driver.execute_script("arguments[0].click();", button)
-                        button_found = True
-                        break
-                if button_found:
-                    break
-            
-            if not button_found:
+            # Try multiple selectors to find the button, all in one script call
+            if not driver.execute_script(CLICK_DETAIL_BUTTON_JS, DETAIL_BUTTON_SELECTORS):
                 logging.warning("Could not find 'Se flere detaljer' button")
                 return {}
+            logging.info("Found 'Se flere detaljer' button, clicked it")
                 
             # Wait for the modal to appear - updated selectors
             WebDriverWait(driver, 5).until(
@@ -395,81 +665,48 @@ def extract_modal_data(driver):
         
         # Look for all the property detail rows in the modal - updated selectors to match new structure
         try:
-            # Try multiple selectors for the modal content based on observed HTML
-            modal_content_selectors = [
-                "//div[@id='modal-root']//div[contains(@class, 'divide-y')]/div[contains(@class, 'flex')]",
-                "//div[contains(@class, 'modal')]//div[contains(@class, 'divide-y')]/div",
-                "//div[contains(@role, 'dialog')]//div[contains(@class, 'divide-y')]/div",
-                "//div[contains(@role, 'dialog')]//div[contains(@class, 'grid')]/div",
-                "//div[contains(@id, 'modal')]//tbody/tr",
-                "//div[contains(@class, 'modal')]//div[contains(@class, 'flex justify-between')]"
-            ]
-            
-            detail_rows = []
-            for selector in modal_content_selectors:
-                rows = driver.find_elements(By.XPATH, selector)
-                if rows:
-                    detail_rows = rows
-                    break
+            # Try multiple selectors for the modal content based on observed HTML; the rows
+            # and their label/value text come back from a single script call
+            detail_rows = driver.execute_script(MODAL_ROWS_JS, MODAL_ROW_SELECTORS)
             
             if detail_rows:
                 logging.info(f"Found {len(detail_rows)} detail rows in modal")
-                
-                # Map Danish property terms to standardized English field names
-                field_mapping = {
-                    'Seneste ombygningsår': 'Last_Remodel_Year',
-                    'Antal plan og etage': 'Floor_Count',
-                    'Antal plan': 'Floor_Count',
-                    'Etage': 'Floor_Count',
-                    'Varmeinstallation': 'Heating_Type',
-                    'Varme': 'Heating_Type',
-                    'Ydervægge': 'Wall_Material',
-                    'Ydermur': 'Wall_Material',
-                    'Vægtet areal': 'Weighted_Area',
-                    'Tagtype': 'Roof_Type',
-                    'Tag': 'Roof_Type',
-                    'Boligareal': 'Living_Area',
-                    'Areal': 'Living_Area',
-                    'Antal værelser': 'Rooms',
-                    'Værelser': 'Rooms',
-                    'Boligtype': 'Property_Type',
-                    'Ejendomstype': 'Property_Type',
-                    'Type': 'Property_Type',
-                    'Energimærke': 'Energy_Label',
-                    'Energimærkning': 'Energy_Label'
-                }
+                # Checked once here rather than by each per-row debug call (--verbose sets it)
+                debug_enabled = logging.getLogger().isEnabledFor(logging.DEBUG)
                 
                 # Process each detail row
                 for row in detail_rows:
                     try:
+                        row_text = row['text'] or ''
+                        
                         # Skip the last row which contains the buttons
-                        if "Luk" in row.text or "Ok" in row.text or "Lukk" in row.text:
+                        if "Luk" in row_text or "Ok" in row_text or "Lukk" in row_text:
                             continue
                             
                         # Try different approaches to extract label and value
-                        row_text = row.text.strip()
+                        row_text = row_text.strip()
                         if not row_text:
                             continue
                             
-                        # Try direct XPath to find label and value
-                        labels = row.find_elements(By.XPATH, ".//div[1] | .//th | .//dt")
-                        values = row.find_elements(By.XPATH, ".//div[2] | .//td | .//dd")
+                        # Label and value found by direct XPath in the script
+                        found_label_value = row['label'] is not None and row['value'] is not None
                         
                         # If XPath didn't work, try parsing the text
-                        if (not labels or not values) and ":" in row_text:
+                        if not found_label_value and ":" in row_text:
                             parts = row_text.split(":", 1)
                             label = parts[0].strip()
                             value = parts[1].strip() if len(parts) > 1 else ""
-                        elif labels and values:
-                            label = labels[0].text.strip()
-                            value = values[0].text.strip()
+                        elif found_label_value:
+                            label = row['label'].strip()
+                            value = row['value'].strip()
                         else:
                             # For cases where the structure is different
                             # Try to identify by common patterns
-                            for known_label in field_mapping.keys():
-                                if known_label.lower() in row_text.lower():
+                            row_text_lower = row_text.lower()
+                            for known_label, known_label_lower in zip(MODAL_FIELD_MAPPING, MODAL_FIELD_MAPPING_LOWER):
+                                label_pos = row_text_lower.find(known_label_lower)
+                                if label_pos != -1:
                                     # Extract value after the known label
-                                    label_pos = row_text.lower().find(known_label.lower())
                                     label = known_label
                                     value = row_text[label_pos + len(known_label):].strip()
                                     if value.startswith(":"):
@@ -477,13 +714,15 @@ def extract_modal_data(driver):
                                     break
                             else:
                                 # If we can't identify the row format, log and continue
-                                logging.debug(f"Could not parse row text: {row_text}")
+                                if debug_enabled:
+                                    logging.debug("Could not parse row text: %s", row_text)
                                 continue
                             
                         # Map the Danish field name to English
                         field_name = None
-                        for danish_term, english_field in field_mapping.items():
-                            if danish_term.lower() in label.lower():
+                        label_lower = label.lower()
+                        for danish_term, english_field in MODAL_FIELD_MAPPING_LOWER.items():
+                            if danish_term in label_lower:
                                 field_name = english_field
                                 break
                                 
@@ -491,20 +730,21 @@ def extract_modal_data(driver):
                             # Clean the value - extract numbers for numerical fields
                             if field_name in ['Living_Area', 'Weighted_Area']:
                                 # Extract number from strings like "189.75 m²"
-                                match = re.search(r'(\d+(?:[,.]\d+)?)', value)
+                                match = DECIMAL_RE.search(value)
                                 if match:
                                     value = match.group(1).replace(',', '.')
                             elif field_name in ['Rooms', 'Floor_Count']:
                                 # Extract number from strings like "2 plan" or just "2"
-                                match = re.search(r'(\d+)', value)
+                                match = INTEGER_RE.search(value)
                                 if match:
                                     value = match.group(1)
                             
                             # Store the value in our result dictionary
                             modal_data[field_name] = value
-                            logging.info(f"Extracted {field_name}: {value}")
+                            if debug_enabled:
+                                logging.debug("Extracted %s: %s", field_name, value)
                     except Exception as e:
-                        logging.warning(f"Error processing detail row: {e}")
+                        logging.warning("Error processing detail row: %s", e)
             else:
                 logging.warning("No detail rows found in modal")
         except Exception as e:
@@ -512,90 +752,56 @@ def extract_modal_data(driver):
             
         # Check for additional information in the main page
         try:
-            # Extract property type - updated selectors for new structure
-            property_type_selectors = [
-                "//span[contains(@class, 'text-gray-700')][1]",
-                "//p[contains(@class, 'text-xs')]/span[contains(@class, 'text-gray-700')]",
-                "//div[contains(@class, 'text-xs')]//span[contains(@class, 'text-gray-700')]"
-            ]
+            # Read the texts for all fields with one script call
+            field_texts = driver.execute_script(FIELD_TEXTS_JS, PAGE_FIELD_SELECTORS)
             
-            for selector in property_type_selectors:
-                property_type_elems = driver.find_elements(By.XPATH, selector)
-                if property_type_elems:
-                    property_type = property_type_elems[0].text.strip()
-                    modal_data['Property_Type'] = property_type
-                    logging.info(f"Extracted Property_Type: {property_type}")
-                    break
+            # Extract property type - updated selectors for new structure
+            property_type_texts = first_match_texts(field_texts['Property_Type'])
+            if property_type_texts:
+                property_type = property_type_texts[0].strip()
+                modal_data['Property_Type'] = property_type
+                logging.info(f"Extracted Property_Type: {property_type}")
                 
             # Extract address - updated selectors for new structure
-            address_selectors = [
-                "//h1[contains(@class, 'text-blue-900')]//span[contains(@class, 'text-lg')]",
-                "//h1[contains(@class, 'text-blue-900')]/span[1]",
-                "//h1[contains(@class, 'space-y-1')]/span[1]"
-            ]
-            
-            for selector in address_selectors:
-                address_elems = driver.find_elements(By.XPATH, selector)
-                if address_elems:
-                    address = address_elems[0].text.strip()
-                    modal_data['Address'] = address
-                    logging.info(f"Extracted Address: {address}")
-                    break
+            address_texts = first_match_texts(field_texts['Address'])
+            if address_texts:
+                address = address_texts[0].strip()
+                modal_data['Address'] = address
+                logging.info(f"Extracted Address: {address}")
                 
             # Extract postal code and city - updated selectors for new structure
-            city_postal_selectors = [
-                "//h1[contains(@class, 'text-blue-900')]//span[contains(@class, 'block')]",
-                "//h1[contains(@class, 'space-y-1')]/span[2]"
-            ]
-            
-            for selector in city_postal_selectors:
-                city_postal_elems = driver.find_elements(By.XPATH, selector)
-                if city_postal_elems:
-                    city_postal = city_postal_elems[0].text.strip()
-                    # Extract postal code and city separately
-                    postal_match = re.search(r'(\d{4})\s+(.*)', city_postal)
-                    if postal_match:
-                        postal_code = postal_match.group(1)
-                        city = postal_match.group(2)
-                        modal_data['Postal_Code'] = postal_code
-                        modal_data['City'] = city
-                        logging.info(f"Extracted Postal_Code: {postal_code}, City: {city}")
-                    else:
-                        modal_data['City'] = city_postal
-                    break
+            city_postal_texts = first_match_texts(field_texts['City_Postal'])
+            if city_postal_texts:
+                city_postal = city_postal_texts[0].strip()
+                # Extract postal code and city separately
+                postal_match = POSTAL_CITY_RE.search(city_postal)
+                if postal_match:
+                    postal_code = postal_match.group(1)
+                    city = postal_match.group(2)
+                    modal_data['Postal_Code'] = postal_code
+                    modal_data['City'] = city
+                    logging.info(f"Extracted Postal_Code: {postal_code}, City: {city}")
+                else:
+                    modal_data['City'] = city_postal
             
             # Extract price - updated selectors for new structure
-            price_selectors = [
-                "//h2[contains(@class, 'text-blue-900')]",
-                "//div[contains(@class, 'text-blue-900')][contains(@class, 'text-28px')]",
-                "//h2[contains(@class, 'text-28px')]"
-            ]
-            
-            for selector in price_selectors:
-                price_elems = driver.find_elements(By.XPATH, selector)
-                if price_elems:
-                    price_text = price_elems[0].text.strip()
-                    # Clean price value
-                    price_match = re.search(r'([\d.,]+)', price_text)
-                    if price_match:
-                        price = price_match.group(1).replace('.', '').replace(',', '')
-                        modal_data['Price'] = price
-                        logging.info(f"Extracted Price: {price}")
-                    break
+            price_texts = first_match_texts(field_texts['Price'])
+            if price_texts:
+                price_text = price_texts[0].strip()
+                # Clean price value
+                price_match = PRICE_NUMBER_RE.search(price_text)
+                if price_match:
+                    price = price_match.group(1).replace('.', '').replace(',', '')
+                    modal_data['Price'] = price
+                    logging.info(f"Extracted Price: {price}")
                     
-            # Extract living area from tags - updated selectors for new structure
-            living_area_selectors = [
-                "//span[contains(text(), 'm²')]",
-                "//div[contains(@class, 'inline-flex')][contains(., 'm²')]//span[contains(@class, 'text-blue-900')]"
-            ]
-            
-            for selector in living_area_selectors:
-                living_area_elems = driver.find_elements(By.XPATH, selector)
-                if living_area_elems:
-                    for elem in living_area_elems:
-                        living_area_text = elem.text.strip()
-                        area_match = re.search(r'(\d+)', living_area_text)
-                        if area_match and 'Living_Area' not in modal_data:
+            # Extract living area from tags - updated selectors for new structure.
+            # The first matched text with a number wins, unless the modal already had it
+            if 'Living_Area' not in modal_data:
+                for texts in field_texts['Living_Area']:
+                    for text in texts:
+                        area_match = INTEGER_RE.search(text.strip())
+                        if area_match:
                             modal_data['Living_Area'] = area_match.group(1)
                             logging.info(f"Extracted Living_Area from tag: {area_match.group(1)}")
                             break
@@ -603,18 +809,11 @@ def extract_modal_data(driver):
                         break
                     
             # Extract rooms - updated selectors for new structure
-            rooms_selectors = [
-                "//span[contains(text(), 'værelser')]",
-                "//div[contains(@class, 'inline-flex')][contains(., 'værelser')]//span[contains(@class, 'text-blue-900')]"
-            ]
-            
-            for selector in rooms_selectors:
-                rooms_elems = driver.find_elements(By.XPATH, selector)
-                if rooms_elems:
-                    for elem in rooms_elems:
-                        rooms_text = elem.text.strip()
-                        rooms_match = re.search(r'(\d+)', rooms_text)
-                        if rooms_match and 'Rooms' not in modal_data:
+            if 'Rooms' not in modal_data:
+                for texts in field_texts['Rooms']:
+                    for text in texts:
+                        rooms_match = INTEGER_RE.search(text.strip())
+                        if rooms_match:
                             modal_data['Rooms'] = rooms_match.group(1)
                             logging.info(f"Extracted Rooms from tag: {rooms_match.group(1)}")
                             break
@@ -636,15 +835,7 @@ def extract_modal_data(driver):
             
         # Close the modal
         try:
-            close_button_selectors = [
-                "//button[contains(text(), 'Luk')]", 
-                "//button[contains(text(), 'Ok')]", 
-                "//button[contains(text(), 'Lukk')]",
-                "//div[@id='modal-root']//button[contains(@class, 'float-right')]",
-                "//div[contains(@role, 'dialog')]//button"
-            ]
-            
-            for selector in close_button_selectors:
+            for selector in CLOSE_BUTTON_SELECTORS:
                 close_buttons = driver.find_elements(By.XPATH, selector)
                 for button in close_buttons:
                     if button.is_displayed():
@@ -660,6 +851,9 @@ def extract_modal_data(driver):
         logging.error("Stack trace:", exc_info=True)
         return {}
 
+# Property types looked for in the page source, in order
+PROPERTY_TYPES = ['Villa', 'Lejlighed', 'Rækkehus', 'Ejerlejlighed', 'Fritidshus', 'Andelsbolig']
+
 def extract_regex_data(html_source):
     """
     Extract property data using regex patterns for faster processing
@@ -684,18 +878,19 @@ def extract_regex_data(html_source):
     # Add more specialized patterns for specific sites
     try:
         # Try to extract prices from multiple formats
-        price_matches = re.findall(r'(?:kr\.?|DKK)\s*([\d.]+)', html_source, re.IGNORECASE)
-        if price_matches:
-            extracted_data['price'] = clean_numerical_value(price_matches[0], 'price')
+        # Only the first match is used, so search stops there instead of scanning the whole page
+        price_match = PAGE_PRICE_RE.search(html_source)
+        if price_match:
+            extracted_data['price'] = clean_numerical_value(price_match.group(1), 'price')
         
         # Try to extract living area in square meters
-        area_matches = re.findall(r'(\d+)\s*(?:m²|kvm)', html_source)
-        if area_matches and 'living_area' not in extracted_data:
-            extracted_data['living_area'] = area_matches[0]
+        if 'living_area' not in extracted_data:
+            area_match = PAGE_AREA_RE.search(html_source)
+            if area_match:
+                extracted_data['living_area'] = area_match.group(1)
         
         # Try to find property type in the HTML
-        property_types = ['Villa', 'Lejlighed', 'Rækkehus', 'Ejerlejlighed', 'Fritidshus', 'Andelsbolig']
-        for prop_type in property_types:
+        for prop_type in PROPERTY_TYPES:
             if prop_type in html_source:
                 extracted_data['property_type'] = prop_type
                 break
@@ -704,7 +899,132 @@ def extract_regex_data(html_source):
         
     return extracted_data
 
-def fetch_property_data(listing_url, header, site_name='unknown', wait_time_seconds=2, retries=3, params_info={}):
+def create_driver():
+    """Start a headless Chrome driver with the scraper's options"""
+    options = webdriver.ChromeOptions()
+    # Enable headless mode
+    options.add_argument('--headless=new')
+    options.add_argument('--disable-gpu')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    options.add_argument('--disable-extensions')
+    options.add_argument('--disable-software-rasterizer')
+    options.add_argument('--disable-webgl')
+    options.add_argument('--disable-gpu-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    options.add_argument('--disable-setuid-sandbox')
+    options.add_argument('--disable-logging')
+    options.add_argument('--log-level=3')
+    options.add_argument('--silent')
+    options.add_experimental_option('excludeSwitches', ['enable-logging'])
+    
+    options.add_argument(f'user-agent={DEFAULT_USER_AGENT}')
+    
+    # Basic performance optimizations
+    options.add_argument('--disable-gpu')
+    options.add_argument('--disable-dev-shm-usage')
+    options.add_argument('--disable-extensions')
+    # Don't download images; the modal and page fields are read from the DOM, and CSS is
+    # still loaded since the button and row lookups check visibility
+    options.add_experimental_option('prefs', {'profile.managed_default_content_settings.images': 2})
+    
+    global chromedriver_path
+    service = webdriver.ChromeService(executable_path=chromedriver_path)
+    driver = webdriver.Chrome(options=options, service=service)
+    chromedriver_path = driver.service.path
+    return driver
+
+def get_driver():
+    """Take a driver from the pool, starting a new one if none is free"""
+    try:
+        return driver_pool.get_nowait()
+    except queue.Empty:
+        driver = create_driver()
+        pooled_drivers.append(driver)
+        return driver
+
+def release_driver(driver, check_alive=False):
+    """
+    Return a driver to the pool. With check_alive (e.g. after an error) a driver
+    that no longer responds is quit instead, and the next get_driver() starts a new one.
+    """
+    if check_alive:
+        try:
+            driver.current_url
+        except Exception:
+            logging.warning("Chrome driver stopped responding, discarding it")
+            pooled_drivers.remove(driver)
+            try:
+                driver.quit()
+            except Exception:
+                pass
+            return
+    driver_pool.put(driver)
+
+@atexit.register
+def quit_drivers():
+    """Quit every pooled driver when the program exits"""
+    for driver in pooled_drivers:
+        try:
+            driver.quit()
+        except Exception:
+            pass
+    pooled_drivers.clear()
+
+# XPath selector for cookie consent accept buttons
+CONSENT_BUTTON_SELECTOR = "//button[contains(text(), 'Accept') or contains(text(), 'Accepter') or contains(text(), 'OK') or contains(@id, 'accept')]"
+
+# Clicks every displayed consent button in one script call, instead of an is_displayed,
+# text and click round trip per button. Returns the texts of the clicked buttons
+CLICK_CONSENT_BUTTONS_JS = """
+const isDisplayed = (element) =>
+    element.getClientRects().length > 0 && getComputedStyle(element).visibility !== 'hidden';
+const matches = document.evaluate(arguments[0], document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+const clicked = [];
+for (let i = 0; i < matches.snapshotLength; i++) {
+    const button = matches.snapshotItem(i);
+    if (isDisplayed(button)) {
+        clicked.push(button.innerText);
+        button.click();
+    }
+}
+return clicked;
+"""
+
+# Extracted detail keys mapped to the standard property data keys
+DETAIL_MAPPING = {
+    'living_area': 'Living_Area',
+    'area': 'Living_Area',
+    'rooms': 'Rooms',
+    'price': 'Price',
+    'property_type': 'Property_Type',
+    'floor': 'Floor',
+    'weighted_area': 'Weighted_Area',
+    'last_remodel_year': 'Last_Remodel_Year',
+    'wall_material': 'Wall_Material',
+    'roof_type': 'Roof_Type',
+    'heating_type': 'Heating_Type'
+}
+
+# Property data fields and their values until the page provides them
+DEFAULT_PROPERTY_DATA = {
+    'Address': 'N/A',
+    'City': 'N/A',
+    'Postal_Code': 'N/A',
+    'Price': 'N/A',
+    'Property_Type': 'N/A',
+    'Living_Area': 'N/A',
+    'Rooms': 'N/A',
+    'Floor': 'N/A',
+    'Floor_Count': 'N/A',
+    'Heating_Type': 'N/A',
+    'Weighted_Area': 'N/A',
+    'Last_Remodel_Year': 'N/A',
+    'Wall_Material': 'N/A',
+    'Roof_Type': 'N/A'
+}
+
+def fetch_property_data(listing_url, header, site_name='unknown', wait_timeout=10, retries=3, params_info={}):
     """
     Fetch property data from a given URL.
     
@@ -712,7 +1032,7 @@ def fetch_property_data(listing_url, header, site_name='unknown', wait_time_seco
         listing_url: URL of the property listing
         header: Header to use for the request
         site_name: Name of the site (for attribution)
-        wait_time_seconds: Time to wait between retries
+        wait_timeout: Maximum time to wait for the property details to render
         retries: Number of times to retry if the page fails to load
         params_info: Additional parameters to add to the property data
         
@@ -732,56 +1052,18 @@ def fetch_property_data(listing_url, header, site_name='unknown', wait_time_seco
     # Log the final URL being used
     logging.info(f"Fetching data from URL: '{listing_url}'")
     
-    options = webdriver.ChromeOptions()
-    # Enable headless mode
-    options.add_argument('--headless=new')
-    options.add_argument('--disable-gpu')
-    options.add_argument('--no-sandbox')
-    options.add_argument('--disable-dev-shm-usage')
-    options.add_argument('--disable-extensions')
-    options.add_argument('--disable-software-rasterizer')
-    options.add_argument('--disable-webgl')
-    options.add_argument('--disable-gpu-sandbox')
-    options.add_argument('--disable-dev-shm-usage')
-    options.add_argument('--disable-setuid-sandbox')
-    options.add_argument('--disable-logging')
-    options.add_argument('--log-level=3')
-    options.add_argument('--silent')
-    options.add_experimental_option('excludeSwitches', ['enable-logging'])
-    
     # Fix for None header - provide default User-Agent if header is None
     if header is None:
-        user_agent = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/96.0.4664.110 Safari/537.36'
+        user_agent = DEFAULT_USER_AGENT
     else:
-        user_agent = header.get("User-Agent", 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/96.0.4664.110 Safari/537.36')
-    
-    options.add_argument(f'user-agent={user_agent}')
-    
-    # Basic performance optimizations
-    options.add_argument('--disable-gpu')
-    options.add_argument('--disable-dev-shm-usage')
-    options.add_argument('--disable-extensions')
-    options.add_argument('--blink-settings=imagesEnabled=true')  # Enable images for modal interaction
+        user_agent = header.get("User-Agent", DEFAULT_USER_AGENT)
     
     driver = None
     property_data = {
         'URL': listing_url,
         'Source_Site': site_name,
-        'Scrape_Date': datetime.datetime.now().strftime('%Y-%m-%d'),
-        'Address': 'N/A',
-        'City': 'N/A',
-        'Postal_Code': 'N/A',
-        'Price': 'N/A',
-        'Property_Type': 'N/A',
-        'Living_Area': 'N/A',
-        'Rooms': 'N/A',
-        'Floor': 'N/A',
-        'Floor_Count': 'N/A',
-        'Heating_Type': 'N/A',
-        'Weighted_Area': 'N/A',
-        'Last_Remodel_Year': 'N/A',
-        'Wall_Material': 'N/A',
-        'Roof_Type': 'N/A'
+        'Scrape_Date': datetime.date.today().isoformat(),
+        **DEFAULT_PROPERTY_DATA
     }
     
     # Add any additional parameters from params_info
@@ -789,8 +1071,11 @@ def fetch_property_data(listing_url, header, site_name='unknown', wait_time_seco
         if key not in property_data:
             property_data[key] = value
     
+    failed = False
     try:
-        driver = webdriver.Chrome(options=options)
+        driver = get_driver()
+        # Pooled drivers share their options, so the user agent is set for each fetch
+        driver.execute_cdp_cmd('Network.setUserAgentOverride', {'userAgent': user_agent})
         
         # Log that we're opening the URL
         logging.info(f"Opening URL in Chrome: '{listing_url}'")
@@ -798,35 +1083,30 @@ def fetch_property_data(listing_url, header, site_name='unknown', wait_time_seco
         # Navigate to the page
         driver.get(listing_url)
         
-        # Set an implicit wait
-        driver.implicitly_wait(5)
-        
         # Check if we ended up on a data: URL, which indicates an issue
         current_url = driver.current_url
         if current_url.startswith('data:'):
             logging.error(f"Navigation failed - redirected to data: URL. Original URL: '{listing_url}'")
             return None
         
-        # Wait for the page to load
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.TAG_NAME, 'body'))
-        )
-        
-        # Short fixed wait
-        time.sleep(wait_time_seconds)
+        # Wait for the details button to render instead of sleeping a fixed time; the wait
+        # returns as soon as it is present. No implicit wait is set, so lookups for
+        # elements that are not on the page return immediately
+        try:
+            WebDriverWait(driver, wait_timeout).until(
+                EC.presence_of_element_located((By.XPATH, "//button[contains(., 'detaljer')]"))
+            )
+        except TimeoutException:
+            logging.warning(f"Property details did not render within {wait_timeout}s: '{listing_url}'")
         
         # Handle cookie consent (simplified version)
         try:
             # Try to accept cookie consent
-            consent_buttons = driver.find_elements(By.XPATH, "//button[contains(text(), 'Accept') or contains(text(), 'Accepter') or contains(text(), 'OK') or contains(@id, 'accept')]")
-            for button in consent_buttons:
-                if button.is_displayed():
-                    try:
-                        logging.info(f"Clicking consent button: {button.text}")
-                        driver.execute_script("arguments[0].click();", button)
-                        time.sleep(1)
-                    except Exception as e:
-                        logging.warning(f"Failed to click consent button: {e}")
+            clicked_buttons = driver.execute_script(CLICK_CONSENT_BUTTONS_JS, CONSENT_BUTTON_SELECTOR)
+            for button_text in clicked_buttons:
+                logging.info("Clicked consent button: %s", button_text)
+            if clicked_buttons:
+                time.sleep(1)
         except Exception as e:
             logging.warning(f"Error handling cookie consent: {e}")
         
@@ -840,15 +1120,21 @@ def fetch_property_data(listing_url, header, site_name='unknown', wait_time_seco
         else:
             logging.warning("No data extracted from modal dialog, falling back to page scraping")
         
-        # Get the page source and parse with BeautifulSoup for static content
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
+        # Get the page source once (each read re-serializes the whole DOM in the browser)
+        # and parse it with Lexbor for static content
+        html_source = driver.page_source
+        
+        # The rest is parsing, so hand the driver back for another worker to load its page
+        release_driver(driver)
+        driver = None
+        
+        tree = LexborHTMLParser(html_source)
         
         # Extract data using regular expressions first for speed
-        html_source = driver.page_source
         regex_details = extract_regex_data(html_source)
         
         # Extract property details from the page using the more thorough method
-        extracted_details = extract_property_details(soup)
+        extracted_details = extract_property_details(tree)
         
         # Initialize details dictionary to combine all sources
         details = {}
@@ -859,23 +1145,8 @@ def fetch_property_data(listing_url, header, site_name='unknown', wait_time_seco
         # Add extracted details (will override regex details if they exist)
         details.update(extracted_details)
         
-        # Map the extracted details to our standard property data keys
-        detail_mapping = {
-            'living_area': 'Living_Area',
-            'area': 'Living_Area',
-            'rooms': 'Rooms',
-            'price': 'Price',
-            'property_type': 'Property_Type',
-            'floor': 'Floor',
-            'weighted_area': 'Weighted_Area',
-            'last_remodel_year': 'Last_Remodel_Year',
-            'wall_material': 'Wall_Material',
-            'roof_type': 'Roof_Type',
-            'heating_type': 'Heating_Type'
-        }
-        
         # Map details to property_data only for fields not already populated by modal data
-        for detail_key, prop_key in detail_mapping.items():
+        for detail_key, prop_key in DETAIL_MAPPING.items():
             if detail_key in details and details[detail_key] and (prop_key not in property_data or property_data[prop_key] == 'N/A'):
                 property_data[prop_key] = details[detail_key]
                 
@@ -897,10 +1168,11 @@ def fetch_property_data(listing_url, header, site_name='unknown', wait_time_seco
     except Exception as e:
         logging.error(f"Error in fetch_property_data: {str(e)}")
         logging.error("Stack trace:", exc_info=True)
+        failed = True
         return property_data
     finally:
         if driver:
-            driver.quit()
+            release_driver(driver, check_alive=failed)
 
 def process_property(property_row, index, total, start_time=None):
     try:
@@ -966,7 +1238,35 @@ def process_property(property_row, index, total, start_time=None):
         logging.error(f"Error processing property {property_id}: {str(e)}")
         return None
 
-def main(sample_size=None, input_file='data/scraped_properties.csv'):
+def save_results(results, output_file):
+    """
+    Write property results to a CSV file, with Property_ID first and the other fields
+    sorted. Fields missing from a result are left empty.
+    """
+    # Get all unique keys for the CSV header
+    all_keys = set()
+    for result in results:
+        all_keys.update(result.keys())
+    
+    # Define the column order with Property_ID first
+    ordered_fields = ['Property_ID']
+    for field in sorted(all_keys):
+        if field != 'Property_ID':
+            ordered_fields.append(field)
+    
+    # Write each result as a row in column order, rather than having DictWriter look
+    # every field up again. The rows go to a temporary file that is synced once and
+    # renamed over the output, so readers never see a half-written CSV
+    tmp_file = f"{output_file}.tmp"
+    with open(tmp_file, 'w', newline='', encoding='utf-8', buffering=CSV_BUFFER_SIZE) as f:
+        writer = csv.writer(f)
+        writer.writerow(ordered_fields)
+        writer.writerows([result.get(field, '') for field in ordered_fields] for result in results)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, output_file)
+
+def main(sample_size=None, input_file='data/scraped_properties.csv', max_workers=MAX_WORKERS):
     """Main function to process property links."""
     try:
         # Determine output file based on input file
@@ -1028,16 +1328,7 @@ def main(sample_size=None, input_file='data/scraped_properties.csv'):
             result = process_property(property_row, 1, 1)
             
             if result:
-                # Define the column order with Property_ID first
-                ordered_fields = ['Property_ID']
-                for field in sorted(result.keys()):
-                    if field != 'Property_ID':
-                        ordered_fields.append(field)
-                
-                with open(output_file, 'w', encoding='utf-8', newline='') as f:
-                    writer = csv.DictWriter(f, fieldnames=ordered_fields)
-                    writer.writeheader()
-                    writer.writerow(result)
+                save_results([result], output_file)
                 logging.info(f"Saved debug result to {output_file}")
             return
         
@@ -1045,12 +1336,27 @@ def main(sample_size=None, input_file='data/scraped_properties.csv'):
         start_time = time.time()
         all_results = []
         
-        # Process properties sequentially to avoid overwhelming the server
-        for i, prop in enumerate(all_properties, 1):
-            result = process_property(prop, i, len(all_properties), start_time)
-            if result:
-                all_results.append(result)
-            logging.info(f"Successfully processed property {i}/{len(all_properties)}")
+        # Fetching is network-bound, so max_workers threads each drive their own pooled
+        # Chrome driver. Results come back in input order
+        total = len(all_properties)
+        def process_indexed(indexed_prop):
+            i, prop = indexed_prop
+            result = process_property(prop, i, total, start_time)
+            logging.info(f"Successfully processed property {i}/{total}")
+            return result
+        
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                for result in executor.map(process_indexed, enumerate(all_properties, 1)):
+                    if result:
+                        all_results.append(result)
+        except BaseException:
+            # Keep what was fetched so far if the run is interrupted or fails part way
+            if all_results:
+                interrupted_file = f"{os.path.splitext(output_file)[0]}_interrupted.csv"
+                save_results(all_results, interrupted_file)
+                logging.warning(f"Saved {len(all_results)} partial results to {interrupted_file}")
+            raise
         
         # Summarize results
         total_time = time.time() - start_time
@@ -1060,25 +1366,7 @@ def main(sample_size=None, input_file='data/scraped_properties.csv'):
         if all_results:
             logging.info(f"Saving {len(all_results)} property details to {output_file}")
             
-            # Get all unique keys for the CSV header
-            all_keys = set()
-            for result in all_results:
-                all_keys.update(result.keys())
-            
-            # Define the column order with Property_ID first
-            ordered_fields = ['Property_ID']
-            for field in sorted(all_keys):
-                if field != 'Property_ID':
-                    ordered_fields.append(field)
-            
-            # Open the CSV file in write mode (not append)
-            with open(output_file, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=ordered_fields)
-                writer.writeheader()
-                # Write all results
-                for result in all_results:
-                    writer.writerow(result)
-            
+            save_results(all_results, output_file)
             logging.info(f"Data successfully saved to {output_file}")
         else:
             logging.warning("No property details were collected")
@@ -1120,6 +1408,11 @@ def get_user_choice():
         except ValueError:
             print("Invalid input. Please enter a number between 1 and 5.")
 
+# Patterns for clean_numerical_value, compiled once since it runs for every extracted value
+NON_DIGIT_RE = re.compile(r'[^\d]')
+NON_NUMBER_RE = re.compile(r'[^\d.,]')
+YEAR_RE = re.compile(r'\d{4}')
+
 def clean_numerical_value(value, value_type='number'):
     """
     Clean and format numerical values from scraped text.
@@ -1139,29 +1432,37 @@ def clean_numerical_value(value, value_type='number'):
     
     if value_type == 'price':
         # Remove currency symbols and separators
-        value = re.sub(r'[^\d]', '', value)
+        value = NON_DIGIT_RE.sub('', value)
     elif value_type == 'area':
         # Remove everything except digits and decimal separator
-        value = re.sub(r'[^\d.,]', '', value)
+        value = NON_NUMBER_RE.sub('', value)
         # Standardize decimal separator to dot
         value = value.replace(',', '.')
     elif value_type == 'year':
         # Extract 4-digit year if present
-        year_match = re.search(r'\d{4}', value)
+        year_match = YEAR_RE.search(value)
         if year_match:
             value = year_match.group(0)
         else:
             # Remove non-digits if no 4-digit year found
-            value = re.sub(r'[^\d]', '', value)
+            value = NON_DIGIT_RE.sub('', value)
     else:  # Generic number
         # Remove everything except digits and decimal separator
-        value = re.sub(r'[^\d.,]', '', value)
+        value = NON_NUMBER_RE.sub('', value)
         # Standardize decimal separator to dot
         value = value.replace(',', '.')
         
     return value
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Scrape detailed property information from boligsiden.dk')
+    parser.add_argument('--verbose', action='store_true', help='Log every selector match and extracted field')
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS,
+                        help=f'Number of properties fetched at the same time, each with its own Chrome driver (default: {MAX_WORKERS})')
+    args = parser.parse_args()
+    if args.verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+    
     try:
         sample_size, input_file = get_user_choice()
         if sample_size is None:
@@ -1173,7 +1474,7 @@ if __name__ == '__main__':
         else:
             print(f"\nStarting sample run with {sample_size} properties from {input_file}...")
         
-        main(sample_size=sample_size, input_file=input_file)
+        main(sample_size=sample_size, input_file=input_file, max_workers=args.workers)
     except KeyboardInterrupt:
         print("\nProcess interrupted by user. Check property_details_interrupted.csv for partial results.")
     except Exception as e: